@@ -0,0 +1,103 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+from instrumentation import count_cache
+
+
+# Finished report files, named by a hash of (report type, entity, dataset version, format)
+ARTIFACT_DIR = ".report_cache"
+
+# Oldest-used artifacts are deleted once the directory grows past this size
+ARTIFACT_CACHE_BYTES = 512 * 1024 * 1024
+
+# Concurrent sessions asking for the same missing artifact build it once: each
+# path maps onto one of these locks, and whoever holds it builds the file
+BUILD_LOCK_STRIPES = 64
+
+_evict_lock = threading.Lock()
+_build_locks = [threading.Lock() for _ in range(BUILD_LOCK_STRIPES)]
+
+
+def artifact_path(report_type, entity, version, export_format, root=ARTIFACT_DIR):
+    # The dataset version already covers the upload content and the reference
+    # table mtimes, so a new snapshot or edited tiers.xlsx gets fresh keys
+    digest = hashlib.sha256(f"{report_type}\0{entity}\0{export_format}".encode()).hexdigest()[:24]
+    return os.path.join(root, f"{version}-{digest}.{export_format}")
+
+
+def _evict(root, max_bytes):
+    with _evict_lock:
+        entries = []
+        for name in os.listdir(root):
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    return data
+
+
+def cached_artifact(report_type, entity, version, export_format, build, root=ARTIFACT_DIR, max_bytes=ARTIFACT_CACHE_BYTES):
+    """
+    Returns the bytes of a finished report, calling build() only on a miss.
+
+    Reports without a dataset version are never cached. Hits refresh the file
+    mtime, which is what eviction orders on. Threads missing on the same
+    artifact wait for the first one's build instead of repeating it.
+    """
+    if not version:
+        return build()
+
+    path = artifact_path(report_type, entity, version, export_format, root)
+    data = _read(path)
+    if data is not None:
+        count_cache("artifact", hit=True)
+        return data
+
+    with _build_locks[hash(path) % BUILD_LOCK_STRIPES]:
+        # Built by another session while this one waited
+        data = _read(path)
+        if data is not None:
+            count_cache("artifact", hit=True)
+            return data
+
+        count_cache("artifact", hit=False)
+        data = build()
+
+        # Write to a temp file and rename, so readers (including other processes)
+        # never see a partial workbook
+        os.makedirs(root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=root, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    _evict(root, max_bytes)
+    return data
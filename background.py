@@ -0,0 +1,73 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+# Streamlit runs streamlitapp.py as a fresh module on every rerun, so its module
+# globals start over with each click. Thread pools and the state they share
+# between sessions live here instead: an imported module exists once per process.
+
+# Background threads that precompute every report table as soon as data is loaded
+PRECOMPUTE_WORKERS = 2
+
+precompute_executor = ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS, thread_name_prefix="fte-precompute")
+precompute_lock = threading.Lock()
+precompute_jobs = OrderedDict()  # dataset version -> {(kind, key): Future}
+
+# Uploads are parsed on this thread pool while the page polls their progress
+LOAD_WORKERS = 2
+
+load_executor = ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="csar-load")
+
+# Set once the app has started importing its deferred modules in the background
+prewarm_lock = threading.Lock()
+prewarm_started = False
+
+
+def queue_precompute(version, submit_jobs, keep):
+    """
+    Registers the jobs of a dataset version, once per version: submit_jobs(executor)
+    returns {key: Future}. Only the keep most recent versions are remembered; the
+    queued jobs of older ones are cancelled.
+    """
+    with precompute_lock:
+        if version in precompute_jobs:
+            precompute_jobs.move_to_end(version)
+            return
+
+        precompute_jobs[version] = submit_jobs(precompute_executor)
+        while len(precompute_jobs) > keep:
+            _, stale_jobs = precompute_jobs.popitem(last=False)
+            for future in stale_jobs.values():
+                future.cancel()
+
+
+def precomputed(version, key, compute):
+    """
+    Returns (result, hit) for a precompute job: its result if finished, awaited if
+    in flight, or compute() run right here if it is queued or was never queued.
+    """
+    owned = None
+    with precompute_lock:
+        jobs = precompute_jobs.get(version, {})
+        future = jobs.get(key)
+
+        # A queued job is pulled forward instead of waiting behind the rest. The
+        # running placeholder makes other sessions asking for it wait on this one
+        if future is not None and future.cancel():
+            future = owned = Future()
+            owned.set_running_or_notify_cancel()
+            jobs[key] = owned
+
+    if future is not None and owned is None:
+        return future.result(), True
+
+    try:
+        result = compute()
+    except BaseException as e:
+        if owned is not None:
+            owned.set_exception(e)
+        raise
+    if owned is not None:
+        owned.set_result(result)
+    return result, False
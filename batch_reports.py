@@ -0,0 +1,132 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+# Headless rendering: no display is available to worker processes
+matplotlib.use("Agg")
+
+from artifact_cache import cached_artifact
+from streamlitapp import (
+    dataset_version,
+    fte_per_course,
+    fte_per_instructor,
+    fte_report_workbook,
+    generate_fte_by_division,
+    get_lookup_index,
+    load_dataset,
+    top_10_chart_png,
+)
+
+
+REPORT_KINDS = ("division", "course", "instructor")
+
+# Loaded once per worker process by _init_worker
+_worker_df = None
+
+
+def load_term(csv_file, term=None):
+    df = load_dataset(csv_file)
+    if term is not None:
+        version = dataset_version(df)
+        df = df[df['Term'] == term].reset_index(drop=True)
+        df.attrs['dataset_version'] = f"{version}-{term}"
+    return df
+
+
+def _init_worker(csv_file, term):
+    global _worker_df
+    _worker_df = load_term(csv_file, term)
+
+
+def _file_slug(name):
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_') or "unnamed"
+
+
+def render_report(df, kind, entity, out_dir):
+    """
+    Renders one entity's FTE report to <out_dir>/<kind>/<entity>_fte_report.xlsx
+    plus a PNG of its Top 10 chart. Returns the workbook path, or None if empty.
+    """
+    if kind == "division":
+        report_df, top_10_df, chart_png, _ = generate_fte_by_division(df, entity)
+    elif kind == "course":
+        report_df, top_10_df = fte_per_course(df, entity)
+        if report_df is not None:
+            chart_png = top_10_chart_png(df, (kind, entity), top_10_df, 'Sec Name', f'Top 10 FTE for {entity}')
+    else:
+        report_df, top_10_df = fte_per_instructor(df, entity)
+        if report_df is not None:
+            chart_png = top_10_chart_png(
+                df, (kind, entity.lower()), top_10_df, 'Sec Name', f'Top 10 FTE for {entity}', color='lightgreen'
+            )
+
+    if report_df is None:
+        return None
+
+    kind_dir = os.path.join(out_dir, kind)
+    os.makedirs(kind_dir, exist_ok=True)
+    base_path = os.path.join(kind_dir, f"{_file_slug(entity)}_fte_report")
+
+    with open(f"{base_path}.png", "wb") as file:
+        file.write(chart_png)
+    workbook = cached_artifact(
+        kind, entity, dataset_version(df), 'xlsx', lambda: fte_report_workbook(report_df, top_10_df, chart_png)
+    )
+    with open(f"{base_path}.xlsx", "wb") as file:
+        file.write(workbook)
+
+    return f"{base_path}.xlsx"
+
+
+def _render_task(task):
+    kind, entity, out_dir = task
+    return render_report(_worker_df, kind, entity, out_dir)
+
+
+def report_entities(df, kinds=REPORT_KINDS):
+    """
+    Lists every (kind, entity) pair that gets its own workbook.
+    """
+    index = get_lookup_index(df)
+    entities = {
+        "division": list(index.divisions),
+        "course": list(index.courses),
+        "instructor": sorted(df['Sec Faculty Info'].dropna().unique()),
+    }
+    return [(kind, entity) for kind in kinds for entity in entities[kind]]
+
+
+def run_batch(csv_file, out_dir, kinds=REPORT_KINDS, term=None, workers=None):
+    """
+    Renders every division/course/instructor report for a term across a process pool.
+    """
+    df = load_term(csv_file, term)
+    tasks = [(kind, entity, out_dir) for kind, entity in report_entities(df, kinds)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(csv_file, term)) as pool:
+        chunksize = max(1, len(tasks) // ((workers or os.cpu_count() or 1) * 4))
+        written = [path for path in pool.map(_render_task, tasks, chunksize=chunksize) if path]
+
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every FTE report for a term without the Streamlit UI.")
+    parser.add_argument("csv_file", help="Dean's daily CSAR export (csv)")
+    parser.add_argument("--out", default="reports", help="Output directory")
+    parser.add_argument("--kind", nargs="+", choices=REPORT_KINDS, default=list(REPORT_KINDS), help="Report types to render")
+    parser.add_argument("--term", help="Only report on this Term (e.g. 2025SP)")
+    parser.add_argument("--workers", type=int, help="Worker processes (defaults to the CPU count)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    written = run_batch(args.csv_file, args.out, args.kind, args.term, args.workers)
+    print(f"Wrote {len(written)} reports to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
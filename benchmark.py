@@ -0,0 +1,394 @@
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+import streamlitapp
+from faculty_workload import FacultyWorkload
+from instructor_search import InstructorSearch
+from reference_tables import CONTACT_HOURS_FILE, REFERENCE_CACHE_DIR, TIERS_FILE
+from streamlitapp import (
+    LookupIndex,
+    compute_fte_metrics,
+    course_enrollment_percentage,
+    export_report,
+    fte_by_division,
+    fte_per_course,
+    fte_per_instructor,
+    read_spreadsheets,
+)
+
+
+# Rows in the sample deanDailyCsar.csv; scales are multiples of this
+SAMPLE_ROWS = 3276
+
+# Where run results are written, and the default baseline they are compared against
+RESULTS_DIR = "benchmark_results"
+BASELINE_FILE = os.path.join(RESULTS_DIR, "baseline.json")
+
+# A stage counts as regressed when it is this much slower (or larger) than the baseline
+REGRESSION_TOLERANCE = 0.25
+
+# ...and by at least this much, so timer noise on millisecond stages isn't flagged
+REGRESSION_FLOOR = {"seconds": 0.05, "peak_mb": 1.0}
+
+# A worksheet holds at most this many rows (header included), so bigger
+# scales skip the full-term xlsx export
+EXCEL_MAX_ROWS = 1048576
+
+# A cold `import streamlitapp` (fresh interpreter, best of IMPORT_RUNS) must stay
+# under this, and must not load the modules the app defers until first use
+IMPORT_BUDGET_SECONDS = 1.0
+IMPORT_RUNS = 3
+DEFERRED_MODULES = ['matplotlib', 'openpyxl', 'seaborn']
+
+# Report slices timed per scale (the busiest divisions, courses and instructors)
+SAMPLED_ENTITIES = 5
+
+CSAR_COLUMNS = [
+    'Term', 'Sec Name', 'X Sec Delivery Method', 'Meeting Times', 'Capacity', 'FTE Count',
+    'Sec Allow Waitlist Flag', 'Total FTE', 'Sec Faculty Info', 'Sec All Faculty Last Names',
+    'Sec Divisions', 'Tier Value', '1926', 'Total Tier', 'Contact Hours',
+]
+
+_BUILDINGS = ['ATC', 'CUH', 'LAH', 'HOS', 'SLC', 'GCB', 'HTC', 'CAF']
+_DAYS = ['M', 'T', 'W', 'TH', 'F', 'MW', 'TTH', 'MWF', 'MTWTH']
+_DELIVERY = ['IN', 'TR', 'BL', 'HY', 'HF']
+_TIERS = [4800, 5340]
+_LAST_NAMES = [
+    'Smith', 'Jones', 'French', 'Davis', 'Walker', 'Wilson', 'Hubbard', 'Rosser', 'Lowe', 'Mead',
+    'Norris', 'Kiel', 'Malloy', 'Soliman', 'Massie', "O'Brien", 'St. John', 'Whittington',
+]
+
+
+def generate_csar(rows, seed=0, terms=("2025SP",)):
+    """
+    Returns (csar, contact_hours, tiers) frames shaped like deanDailyCsar.csv,
+    contact_hours.xlsx and tiers.xlsx, with about `rows` CSAR rows.
+    """
+    rng = np.random.default_rng(seed)
+
+    # About 44% of sample rows are extra meeting patterns of a section listed above them
+    n_sections = max(1, int(rows / 1.44))
+    n_prefixes = max(4, min(400, n_sections // 40))
+    prefixes = np.array([f"{chr(65 + i // 676)}{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}" for i in range(n_prefixes)])
+    n_courses = max(n_prefixes, n_sections // 5)
+
+    course_prefix = prefixes[rng.integers(0, n_prefixes, n_courses)]
+    course_code = pd.Series(course_prefix) + '-' + pd.Series(rng.integers(100, 300, n_courses)).astype(str)
+    course_code = course_code.drop_duplicates().to_numpy()
+    n_courses = len(course_code)
+    course_hours = rng.choice([2, 3, 3, 3, 4, 5, 6, 9], n_courses)
+
+    course = rng.integers(0, n_courses, n_sections)
+    section_no = pd.Series(np.arange(n_sections) % 9000 + 1000).astype(str)
+    sec_name = pd.Series(course_code[course]) + '-' + section_no
+    term = np.array(terms)[rng.integers(0, len(terms), n_sections)]
+
+    n_faculty = max(2, n_sections // 6)
+    initials = np.array([chr(65 + i) for i in range(26)])
+    faculty_last = np.array(_LAST_NAMES)[rng.integers(0, len(_LAST_NAMES), n_faculty)]
+    faculty = pd.Series(initials[rng.integers(0, 26, n_faculty)]) + '. ' + pd.Series(faculty_last) + pd.Series(np.arange(n_faculty) // len(_LAST_NAMES)).astype(str).replace('0', '')
+    section_faculty = rng.integers(0, n_faculty, n_sections)
+    # About 14% of sections are team-taught and list a second instructor
+    faculty_info = pd.Series(faculty.to_numpy()[section_faculty])
+    shared = rng.random(n_sections) < 0.14
+    faculty_info[shared] = faculty_info[shared] + ', ' + faculty.to_numpy()[rng.integers(0, n_faculty, shared.sum())]
+    faculty_info = faculty_info.to_numpy()
+
+    n_divisions = max(2, min(40, n_prefixes // 4))
+    prefix_division = rng.integers(0, n_divisions, n_prefixes)
+    divisions = np.array([f"C{['BUS', 'GEN', 'HLT', 'TEC'][i % 4]}{i // 4 + 1}" for i in range(n_divisions)])
+    section_division = divisions[prefix_division[np.searchsorted(np.sort(prefixes), pd.Series(course_code[course]).str[:3])]]
+
+    capacity = rng.choice([0, 15, 18, 20, 24, 24, 25, 30, 35], n_sections)
+    fte_count = np.minimum(capacity, rng.integers(0, 40, n_sections))
+    tier_value = np.array(_TIERS)[rng.integers(0, 2, n_sections)]
+    hours = course_hours[course]
+
+    online = rng.random(n_sections) < 0.45
+    start_minute = rng.integers(16, 40, n_sections) * 30
+    end_minute = start_minute + rng.choice([50, 80, 110, 170], n_sections)
+
+    def clock(minutes):
+        hour = minutes // 60
+        text = pd.Series(np.where(hour % 12 == 0, 12, hour % 12)).astype(str).str.zfill(2)
+        return text + ':' + pd.Series(minutes % 60).astype(str).str.zfill(2) + pd.Series(np.where(hour >= 12, 'PM', 'AM'))
+
+    room = pd.Series(np.array(_BUILDINGS)[rng.integers(0, len(_BUILDINGS), n_sections)]).str.ljust(5) + \
+        pd.Series(rng.integers(100, 400, n_sections)).astype(str).str.ljust(9)
+    days = pd.Series(np.array(_DAYS)[rng.integers(0, len(_DAYS), n_sections)]).str.ljust(10)
+    in_person = room + 'CLAS ' + days + clock(start_minute) + ' ' + clock(end_minute)
+    remote = pd.Series('DED  INET     CLAS MTWTHFSSU TBA            ', index=in_person.index)
+    meeting_times = '01/13/25 05/14/25 ' + remote.where(online, in_person)
+
+    calculated = np.round(hours * 16 * fte_count / 512, 2)
+    sections = pd.DataFrame({
+        'Term': term,
+        'Sec Name': sec_name,
+        'X Sec Delivery Method': np.array(_DELIVERY)[rng.integers(0, len(_DELIVERY), n_sections)],
+        'Meeting Times': meeting_times,
+        'Capacity': capacity,
+        'FTE Count': fte_count,
+        'Sec Allow Waitlist Flag': np.where(rng.random(n_sections) < 0.6, 'Y', 'N'),
+        'Total FTE': calculated,
+        'Sec Faculty Info': faculty_info,
+        'Sec All Faculty Last Names': faculty_last[section_faculty],
+        'Sec Divisions': section_division,
+        'Tier Value': tier_value,
+        '1926': 1926,
+        'Total Tier': tier_value + 1926,
+        'Contact Hours': hours,
+    })
+
+    # Second meeting pattern rows: same section, online meeting, no division/last names
+    extra = sections.sample(n=max(0, rows - n_sections), replace=True, random_state=seed)
+    extra = extra.assign(**{
+        'Meeting Times': '01/13/25 05/14/25 DED  INET     CLAS MTWTHFSSU TBA            ',
+        'Sec Divisions': np.nan,
+        'Sec All Faculty Last Names': np.nan,
+    })
+    csar = pd.concat([sections, extra]).sort_values('Sec Name', kind='stable', ignore_index=True)
+
+    contact_hours = pd.DataFrame({
+        'Sec Name': course_code,
+        'FTE Count': rng.integers(10, 30, n_courses),
+        'Total FTE': np.round(course_hours * 16 * 20 / 512, 2),
+        'Contact Hours': course_hours,
+    })
+    tiers = pd.DataFrame({
+        'Prefix/Course ID': prefixes,
+        'Course Title': [f"Program {prefix}" for prefix in prefixes],
+        'Tier': rng.choice(['1A', '1B', '2'], n_prefixes),
+        'Old pay': 4498.74,
+        'New Sector': np.array(_TIERS)[rng.integers(0, 2, n_prefixes)],
+    })
+    return csar[CSAR_COLUMNS], contact_hours, tiers
+
+
+def write_dataset(directory, rows, seed=0):
+    """
+    Writes a synthetic CSAR csv plus matching contact_hours.xlsx and tiers.xlsx
+    into directory. Returns the csv path.
+    """
+    csar, contact_hours, tiers = generate_csar(rows, seed)
+    csv_path = os.path.join(directory, "csar.csv")
+    csar.to_csv(csv_path, index=False)
+    contact_hours.to_excel(os.path.join(directory, CONTACT_HOURS_FILE), index=False)
+    tiers.to_excel(os.path.join(directory, TIERS_FILE), index=False)
+    return csv_path
+
+
+def _measure(results, stage, func, *args):
+    # Timed once without tracing (tracemalloc slows allocation-heavy code
+    # several-fold), then again under tracemalloc for the peak
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    results[stage] = {"seconds": round(elapsed, 4), "peak_mb": round(peak / 1e6, 2)}
+    return result
+
+
+def _each(func, entities, *args):
+    for entity in entities:
+        func(*args, entity)
+
+
+def _read_cold(csv_path):
+    shutil.rmtree(REFERENCE_CACHE_DIR, ignore_errors=True)
+    return read_spreadsheets(csv_path)
+
+
+def _busiest(positions, count=SAMPLED_ENTITIES):
+    return sorted(positions, key=lambda key: len(positions[key]), reverse=True)[:count]
+
+
+def run_scale(scale, seed=0):
+    """
+    Times and memory-profiles every report path and export at one scale.
+
+    Peak memory is what tracemalloc sees (Python and NumPy allocations); buffers
+    allocated inside the CSV parser or Arrow are not included.
+    """
+    # The app warms these up after its first page; so does the benchmark, so the
+    # chart and xlsx stages time the work rather than the imports
+    for module in streamlitapp.DEFERRED_IMPORTS:
+        importlib.import_module(module)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = write_dataset(directory, SAMPLE_ROWS * scale, seed)
+        cwd = os.getcwd()
+        # The reference workbooks (and their compiled cache) are resolved from the CWD
+        os.chdir(directory)
+        try:
+            # The first read also compiles the reference workbooks to Parquet
+            _measure(results, "read_spreadsheets (cold)", _read_cold, csv_path)
+            df = _measure(results, "read_spreadsheets", read_spreadsheets, csv_path)
+            df = _measure(results, "compute_fte_metrics", compute_fte_metrics, df)
+            index = _measure(results, "lookup index", LookupIndex, df)
+            _measure(results, "instructor search index", InstructorSearch, df)
+            workload = _measure(results, "faculty workload matrix", FacultyWorkload, df)
+            _measure(results, "faculty workload totals", workload.totals)
+            df.attrs['dataset_version'] = f"benchmark-{scale}-{seed}"
+
+            divisions = _busiest(index.divisions)
+            courses = _busiest(index.courses)
+            instructors = df['Sec Faculty Info'].value_counts().index[:SAMPLED_ENTITIES].tolist()
+
+            _measure(results, "fte_by_division (all divisions)", _each, fte_by_division, list(index.divisions), df)
+            _measure(results, f"fte_per_course (top {len(courses)})", _each, fte_per_course, courses, df)
+            _measure(
+                results, f"course_enrollment_percentage (top {len(courses)})",
+                _each, lambda course: course_enrollment_percentage(course, df), courses,
+            )
+            _measure(results, f"fte_per_instructor (top {len(instructors)})", _each, fte_per_instructor, instructors, df)
+
+            report_df, top_10_df = fte_by_division(df, divisions[0])
+            chart_png = _measure(
+                results, "top 10 chart", streamlitapp._draw_top_10_png,
+                top_10_df['Course Code'].tolist(), top_10_df['Generated FTE'].tolist(), "benchmark", 'skyblue', True,
+            )
+            _measure(results, "export division xlsx", streamlitapp.fte_report_workbook, report_df, top_10_df, chart_png)
+
+            term_df = df.drop(columns=['Enrollment Percentage'])
+            for export_format in ('xlsx', 'csv', 'parquet'):
+                if export_format == 'xlsx' and len(term_df) >= EXCEL_MAX_ROWS:
+                    continue
+                _measure(results, f"export full term {export_format}", export_report, term_df, export_format)
+        finally:
+            os.chdir(cwd)
+
+    return {"rows": SAMPLE_ROWS * scale, "stages": results}
+
+
+def measure_import(module="streamlitapp", runs=IMPORT_RUNS):
+    """
+    Times a cold import of module in fresh interpreters. Returns the best time
+    and the DEFERRED_MODULES the import loaded anyway.
+    """
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "seconds = time.perf_counter() - start\n"
+        f"print(json.dumps([seconds, [name for name in {DEFERRED_MODULES!r} if name in sys.modules]]))\n"
+    )
+    best, loaded = None, []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        seconds, loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+        best = seconds if best is None else min(best, seconds)
+    return {"seconds": round(best, 4), "deferred_loaded": loaded}
+
+
+def compare(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    """
+    Returns (scale, stage, metric, baseline, current) for every measurement that
+    got worse than the baseline by more than tolerance.
+    """
+    regressions = []
+    for scale, run in current["scales"].items():
+        base_run = baseline.get("scales", {}).get(scale)
+        if base_run is None:
+            continue
+        for stage, metrics in run["stages"].items():
+            base_metrics = base_run["stages"].get(stage)
+            if base_metrics is None:
+                continue
+            for metric, value in metrics.items():
+                base_value = base_metrics[metric]
+                if value > base_value * (1 + tolerance) and value - base_value >= REGRESSION_FLOOR[metric]:
+                    regressions.append((scale, stage, metric, base_value, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline on synthetic CSAR data.")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated multiples of the sample file (e.g. 10,100,1000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the generated data")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Results file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="Allowed slowdown before a stage is flagged")
+    parser.add_argument("--import-budget", type=float, default=IMPORT_BUDGET_SECONDS, help="Allowed cold import time of the app (seconds)")
+    args = parser.parse_args()
+
+    # Checked first, in fresh interpreters, before this process warms any caches
+    startup = measure_import()
+    print(f"import streamlitapp: {startup['seconds']:.3f}s (budget {args.import_budget:.3f}s)")
+    over_budget = []
+    if startup["seconds"] > args.import_budget:
+        over_budget.append(f"cold import took {startup['seconds']:.3f}s")
+    if startup["deferred_loaded"]:
+        over_budget.append(f"import loaded {', '.join(startup['deferred_loaded'])}")
+
+    current = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "seed": args.seed,
+        "import": startup,
+        "scales": {},
+    }
+    # --scales "" checks only the import budget
+    for scale in (int(value) for value in args.scales.split(",") if value):
+        run = run_scale(scale, args.seed)
+        current["scales"][str(scale)] = run
+        print(f"\n{scale}x ({run['rows']} rows)")
+        for stage, metrics in run["stages"].items():
+            print(f"  {stage:<55} {metrics['seconds']:>9.3f}s {metrics['peak_mb']:>10.1f} MB")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f"run-{current['created'].replace(':', '')}.json")
+    with open(output_path, "w") as file:
+        json.dump(current, file, indent=2)
+    print(f"\nResults written to {output_path}")
+
+    for problem in over_budget:
+        print(f"IMPORT BUDGET: {problem}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(current, file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions = compare(current, json.load(file), args.tolerance)
+        for scale, stage, metric, base_value, value in regressions:
+            print(f"REGRESSION {scale}x {stage}: {metric} {base_value} -> {value}")
+        if regressions:
+            raise SystemExit(1)
+        print("No regressions against the baseline.")
+
+    if over_budget:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
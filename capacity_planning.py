@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+from meeting_times import parse_meeting_times
+from sections import SECTION_KEY, first_section_rows
+
+
+# Sections filled below this share of their seats are candidates to merge away
+UNDERFILLED_FILL = 0.5
+
+# Sections taking in merged students may be filled up to this share of their seats
+MERGED_MAX_FILL = 0.95
+
+# Share of a merged section's students expected to enroll in the section they move to
+MERGE_RETENTION = 0.9
+
+# Groups filled at or above this share, with waitlists allowed, get an added section
+ADD_SECTION_FILL = 0.95
+
+# Expected enrollment of an added section, as a share of the group's median capacity
+NEW_SECTION_FILL = 0.5
+
+# Sections can only merge within one term, course, delivery method and slot
+PLAN_GROUP_COLUMNS = ['Term', 'Course Code', 'X Sec Delivery Method', 'Slot']
+
+# Slot = meeting days plus the part of the day the first timed meeting starts in
+DAY_PART_STARTS = [0, 12 * 60, 17 * 60]
+DAY_PART_LABELS = ['Morning', 'Afternoon', 'Evening']
+UNSCHEDULED_SLOT = 'Unscheduled'
+
+PLAN_COLUMNS = [
+    'Action', 'Term', 'Sec Divisions', 'Course Code', 'X Sec Delivery Method', 'Slot', 'Sec Name',
+    'Move Students To', 'Sections', 'Capacity', 'FTE Count', 'Fill', 'Group Fill',
+    'Seats Change', 'FTE Count Change', 'Generated FTE Change',
+]
+
+
+def _sections(df):
+    # One row per section with its slot and fill; sections without a timed
+    # meeting (online, TBA) share one slot
+    meetings = parse_meeting_times(df['Meeting Times'])
+    start = meetings['Start Minute'].to_numpy(dtype=float)
+    timed = np.flatnonzero(~np.isnan(start) & (meetings['Day Mask'].to_numpy() > 0))
+
+    keys = df[SECTION_KEY]
+    first_timed = timed[first_section_rows(keys.iloc[timed])]
+    parts = np.asarray(DAY_PART_LABELS)[np.searchsorted(DAY_PART_STARTS, start[first_timed], side='right') - 1]
+    slots = pd.Series(
+        meetings['Meeting Days'].astype(str).to_numpy()[first_timed] + ' ' + parts,
+        index=pd.MultiIndex.from_frame(keys.iloc[first_timed]),
+    )
+
+    first = first_section_rows(keys)
+    sections = df.loc[first, [
+        'Term', 'Sec Divisions', 'Course Code', 'X Sec Delivery Method', 'Sec Name',
+        'Sec Allow Waitlist Flag', 'Capacity', 'FTE Count', 'Generated FTE',
+    ]].reset_index(drop=True)
+    sections['Slot'] = slots.reindex(pd.MultiIndex.from_frame(sections[SECTION_KEY])).fillna(UNSCHEDULED_SLOT).to_numpy()
+    sections['Capacity'] = sections['Capacity'].astype(float)
+    sections['FTE Count'] = sections['FTE Count'].astype(float)
+
+    # Sections without a capacity can't be compared by fill, so they are left out
+    sections = sections[sections['Capacity'] > 0].copy()
+    sections['Fill'] = sections['FTE Count'] / sections['Capacity']
+    return sections
+
+
+def plan_capacity(df, underfilled_fill=UNDERFILLED_FILL, merged_max_fill=MERGED_MAX_FILL,
+                  retention=MERGE_RETENTION, add_section_fill=ADD_SECTION_FILL, new_section_fill=NEW_SECTION_FILL):
+    """
+    Recommends section merges and additions for every course of the loaded data.
+
+    Sections of a term, course, delivery method and slot are ranked by fill.
+    The least-filled ones are merged away while the better-filled sections of
+    the group still have seats for everyone at merged_max_fill; each merge
+    names the kept section with the most spare seats and loses the students
+    not retained. Groups at add_section_fill or above with a waitlist allowed
+    get one added section, expected to fill to new_section_fill of the group's
+    median capacity.
+
+    Everything is computed with group-level transforms over the whole frame;
+    returns one row per recommendation (see PLAN_COLUMNS).
+    """
+    sections = _sections(df)
+    grouped = sections.groupby(PLAN_GROUP_COLUMNS, observed=True, sort=False)
+    sections['Sections'] = grouped['Sec Name'].transform('size')
+    sections['Group Enrollment'] = grouped['FTE Count'].transform('sum')
+    sections['Group Capacity'] = grouped['Capacity'].transform('sum')
+    sections['Group Fill'] = sections['Group Enrollment'] / sections['Group Capacity']
+
+    # Merges: best-filled sections first; a section goes once the seats ranked
+    # above it hold the whole group at the merged fill
+    ranked = sections.sort_values(PLAN_GROUP_COLUMNS + ['Fill'], ascending=[True] * len(PLAN_GROUP_COLUMNS) + [False])
+    ranked_groups = ranked.groupby(PLAN_GROUP_COLUMNS, observed=True, sort=False)
+    seats_above = ranked_groups['Capacity'].cumsum() - ranked['Capacity']
+    merge = (
+        (ranked_groups.cumcount() > 0)
+        & (ranked['Fill'] < underfilled_fill)
+        & (seats_above * merged_max_fill >= ranked['Group Enrollment'])
+    )
+
+    kept = ranked[~merge]
+    spare = kept['Capacity'] * merged_max_fill - kept['FTE Count']
+    receivers = kept.loc[spare.groupby([kept[col] for col in PLAN_GROUP_COLUMNS], observed=True).idxmax()]
+    receivers = receivers[PLAN_GROUP_COLUMNS + ['Sec Name']].rename(columns={'Sec Name': 'Move Students To'})
+
+    merges = ranked[merge].merge(receivers, on=PLAN_GROUP_COLUMNS, how='left')
+    merges['Action'] = 'Merge'
+    merges['Seats Change'] = -merges['Capacity']
+    merges['FTE Count Change'] = -(merges['FTE Count'] * (1 - retention)).round(1)
+    merges['Generated FTE Change'] = -(merges['Generated FTE'] * (1 - retention)).round(2)
+
+    # Additions: one row per full group that allows a waitlist
+    groups = grouped.agg(**{
+        'Sec Divisions': ('Sec Divisions', 'first'),
+        'Sections': ('Sec Name', 'size'),
+        'Median Capacity': ('Capacity', 'median'),
+        'Enrollment': ('FTE Count', 'sum'),
+        'Seats': ('Capacity', 'sum'),
+        'Generated FTE': ('Generated FTE', 'sum'),
+        'Waitlist': ('Sec Allow Waitlist Flag', 'any'),
+    }).reset_index()
+    groups['Group Fill'] = groups['Enrollment'] / groups['Seats']
+    additions = groups[(groups['Group Fill'] >= add_section_fill) & groups['Waitlist'].astype(bool)].copy()
+    new_enrollment = (additions['Median Capacity'] * new_section_fill).round()
+    additions['Action'] = 'Add'
+    additions['Capacity'] = additions['Median Capacity']
+    additions['Seats Change'] = additions['Median Capacity']
+    additions['FTE Count Change'] = new_enrollment
+    additions['Generated FTE Change'] = (new_enrollment * additions['Generated FTE'] / additions['Enrollment']).round(2)
+
+    plan = pd.concat([merges, additions], ignore_index=True).reindex(columns=PLAN_COLUMNS)
+    plan[['Fill', 'Group Fill']] = plan[['Fill', 'Group Fill']].round(4)
+    return plan.sort_values(['Action', 'Generated FTE Change'], ascending=[False, True], ignore_index=True)
@@ -0,0 +1,145 @@
+import argparse
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from sections import SECTION_KEY
+
+
+# Rows parsed, enriched and folded into the running totals per step
+CSV_CHUNK_ROWS = 50_000
+
+# Running totals: report name -> section column it groups on
+TOTALS_GROUPINGS = {'division': 'Sec Divisions', 'course': 'Course Code', 'instructor': 'Sec Faculty Info'}
+
+TOTALS_COLUMNS = ['Sections', 'Capacity', 'FTE Count', 'Calculated FTE', 'Generated FTE']
+
+
+def concat_chunks(chunks):
+    """
+    Concatenates typed chunks into one frame, emptying the list as it goes.
+    Columns are combined one at a time and dropped from the chunks right away,
+    so the peak is about one column over the finished frame rather than two
+    full copies. Categorical columns are combined with union_categoricals,
+    since a plain concat of chunks with different categories falls back to
+    full-size strings.
+    """
+    if len(chunks) == 1:
+        return chunks.pop()
+
+    columns = list(chunks[0].columns)
+    combined = {}
+    for col in columns:
+        parts = [chunk.pop(col) for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            combined[col] = pd.Series(union_categoricals(parts), name=col)
+        else:
+            combined[col] = pd.concat(parts, ignore_index=True)
+        del parts
+    chunks.clear()
+    return pd.DataFrame(combined, columns=columns)
+
+
+class RunningTotals:
+    """
+    Division, course and instructor totals folded in one enriched chunk at a
+    time, so they are available while a file is still loading (and for files
+    too large to hold in memory at all).
+
+    Division totals sum every row of the division, like FTE by Division; course
+    and instructor totals count each section once, like their reports. Sections
+    already seen are remembered as sorted 64-bit hashes of (Term, Sec Name)
+    (8 bytes each).
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self._seen = np.array([], dtype=np.uint64)
+        self._totals = {by: None for by in TOTALS_GROUPINGS}
+        self._lock = threading.Lock()
+
+    def add(self, chunk):
+        hashes = pd.util.hash_pandas_object(chunk[SECTION_KEY], index=False).to_numpy()
+        new_section = ~np.isin(hashes, self._seen) & ~pd.Series(hashes).duplicated().to_numpy()
+
+        measures = pd.DataFrame({
+            'Sections': new_section.astype(np.int64),
+            'Capacity': chunk['Capacity'].to_numpy(dtype=float),
+            'FTE Count': chunk['FTE Count'].to_numpy(dtype=float),
+            'Calculated FTE': chunk['Calculated FTE'].to_numpy(dtype=float),
+            'Generated FTE': chunk['Generated FTE'].to_numpy(dtype=float),
+        })
+
+        grouped = {}
+        for by, column in TOTALS_GROUPINGS.items():
+            keys = pd.Series(chunk[column].astype('string').str.strip().to_numpy(), dtype='string')
+            if by == 'division':
+                grouped[by] = measures.groupby(keys.str.upper()).sum()
+            else:
+                grouped[by] = measures[new_section].groupby(keys[new_section]).sum()
+
+        with self._lock:
+            self.rows += len(chunk)
+            self._seen = np.union1d(self._seen, hashes[new_section])
+            for by, group in grouped.items():
+                current = self._totals[by]
+                self._totals[by] = group if current is None else current.add(group, fill_value=0)
+
+    @property
+    def sections(self):
+        return len(self._seen)
+
+    def table(self, by='division'):
+        """
+        Returns the totals so far for one grouping, largest Generated FTE first.
+        """
+        with self._lock:
+            totals = self._totals[by]
+        if totals is None:
+            return pd.DataFrame(columns=[TOTALS_GROUPINGS[by]] + TOTALS_COLUMNS)
+
+        totals = totals.round(2).astype({'Sections': np.int64})
+        totals.index.name = TOTALS_GROUPINGS[by]
+        return totals.sort_values('Generated FTE', ascending=False).reset_index()
+
+
+class IngestProgress:
+    """
+    Shared state of a load running in another thread: the fraction of the file
+    parsed so far and the running totals.
+    """
+
+    def __init__(self):
+        self.fraction = 0.0
+        self.totals = RunningTotals()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Print the division, course and instructor FTE totals of a CSAR file, reading it in chunks without keeping its rows."
+    )
+    parser.add_argument("csv_file", help="Dean's daily CSAR export (csv)")
+    parser.add_argument("--by", nargs="+", choices=list(TOTALS_GROUPINGS), default=list(TOTALS_GROUPINGS), help="Totals to print")
+    parser.add_argument("--chunk-rows", type=int, default=CSV_CHUNK_ROWS, help="Rows parsed per chunk (bounds peak memory)")
+    parser.add_argument("--out", help="Save each table to <out>/<grouping>_totals.csv instead of printing it")
+    args = parser.parse_args()
+
+    from streamlitapp import stream_csar
+
+    _, totals = stream_csar(args.csv_file, chunk_rows=args.chunk_rows, keep_rows=False)
+    print(f"{totals.rows:,} rows, {totals.sections:,} sections")
+    for by in args.by:
+        table = totals.table(by)
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            table.to_csv(os.path.join(args.out, f"{by}_totals.csv"), index=False)
+        else:
+            print(f"\n{TOTALS_GROUPINGS[by]} totals")
+            print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+from instructor_search import _distinct
+from sections import SECTION_KEY, first_section_rows
+
+
+# Measures credited to instructors; Contact Hours and the FTE columns come from the section
+WORKLOAD_MEASURES = ['Sections', 'Contact Hours', 'FTE Count', 'Calculated FTE', 'Generated FTE']
+
+# shared: a team-taught section's measures are split evenly between its instructors;
+# full: every instructor gets the whole section (totals then exceed the college total)
+WEIGHTINGS = ('shared', 'full')
+
+# Sec Faculty Info lists are cut off by the export, e.g. "A. Fann, J. Jones, K (more)"
+TRUNCATED_MARKER = '(more)'
+
+
+def split_faculty_info(text):
+    """
+    Splits a Sec Faculty Info value into instructor names, dropping the name
+    cut off by "(more)" (its last name is recovered from Sec All Faculty Last Names).
+    """
+    if not isinstance(text, str):
+        return []
+    names = [name.strip() for name in text.split(',')]
+    return [name for name in names if name and TRUNCATED_MARKER not in name]
+
+
+def last_name(name):
+    # "K. Hogsten Utley" -> "Hogsten Utley"
+    return name.split('. ', 1)[-1].strip()
+
+
+class FacultyWorkload:
+    """
+    Sparse instructor x section incidence of a loaded CSAR frame, exploded
+    once at load time.
+
+    Instructors of a section are the names in its Sec Faculty Info plus any
+    name from the Sec All Faculty Last Names of its meeting rows that the
+    (possibly truncated) list didn't already cover. Each (section, instructor)
+    pair carries a shared-credit weight of 1 / number of instructors, so every
+    instructor's totals come out of one grouped pass over the pairs.
+    """
+
+    def __init__(self, df):
+        # Sections are numbered by first appearance, so code i is the section at first[i]
+        section_codes = df.groupby(SECTION_KEY, sort=False, dropna=False).ngroup().to_numpy()
+        first = np.flatnonzero(first_section_rows(df[SECTION_KEY]))
+
+        # One row per section, in code order
+        self.sections = pd.DataFrame({
+            'Term': df['Term'].to_numpy()[first],
+            'Sec Name': df['Sec Name'].to_numpy()[first],
+            'Course Code': df['Course Code'].to_numpy()[first],
+            'Sec Divisions': df['Sec Divisions'].to_numpy()[first],
+            'Sections': 1.0,
+            **{col: df[col].to_numpy(dtype=float)[first] for col in WORKLOAD_MEASURES[1:]},
+        })
+
+        # Sec Faculty Info is parsed once per distinct value, then expanded by code
+        values, codes = _distinct(df['Sec Faculty Info'])
+        parsed = [split_faculty_info(value) for value in values]
+        counts = np.array([len(names) for names in parsed] + [0], dtype=np.int64)
+        flat_names = np.array([name for names in parsed for name in names] or [''], dtype=object)
+        starts = np.concatenate([[0], np.cumsum(counts[:-1])])
+
+        section_values = codes[first]
+        section_values = np.where(section_values >= 0, section_values, len(values))
+        repeats = counts[section_values]
+        listed_sections = np.repeat(np.arange(len(first)), repeats)
+        offsets = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        listed_names = np.repeat(starts[section_values], repeats) + offsets
+
+        # Last names from the meeting rows, as (section, distinct value) pairs
+        last_values, last_codes = _distinct(df['Sec All Faculty Last Names'])
+        last_values = [str(value).strip() for value in last_values]
+        rows = np.flatnonzero(last_codes >= 0)
+        last_pairs = np.unique(section_codes[rows].astype(np.int64) * max(len(last_values), 1) + last_codes[rows])
+        last_sections = last_pairs // max(len(last_values), 1)
+        last_names = last_pairs % max(len(last_values), 1)
+
+        # A last name is extra unless a listed name of its section has it; both
+        # sides are compared as integer (section, lower-cased last name) keys
+        keys = {}
+        listed_keys = np.array([keys.setdefault(last_name(name).lower(), len(keys)) for name in flat_names], dtype=np.int64)
+        last_keys = np.array([keys.setdefault(value.lower(), len(keys)) for value in last_values] or [0], dtype=np.int64)
+        covered = listed_sections * len(keys) + listed_keys[listed_names]
+        extra = ~np.isin(last_sections * len(keys) + last_keys[last_names], covered)
+        extra &= np.array([bool(value) for value in last_values] or [False])[last_names]
+
+        pairs = pd.DataFrame({
+            'Section': np.concatenate([listed_sections, last_sections[extra]]),
+            'Instructor': np.concatenate([flat_names[listed_names], np.array(last_values, dtype=object)[last_names[extra]]]),
+        }).drop_duplicates()
+        instructors = pd.Categorical(pairs['Instructor'].astype(str))
+        per_section = np.bincount(pairs['Section'].to_numpy(), minlength=len(first))
+
+        self.incidence = pd.DataFrame({
+            'Section': pairs['Section'].to_numpy(dtype=np.int64),
+            'Instructor': instructors,
+            'Share': 1.0 / per_section[pairs['Section'].to_numpy()],
+        }).sort_values(['Instructor', 'Section'], ignore_index=True)
+        self.instructors = list(instructors.categories)
+        self.instructor_counts = per_section
+
+    def _credited(self, incidence, weighting):
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unsupported weighting: {weighting}")
+        section = incidence['Section'].to_numpy()
+        weight = incidence['Share'].to_numpy() if weighting == 'shared' else np.ones(len(incidence))
+        credited = pd.DataFrame({
+            col: self.sections[col].to_numpy()[section] * weight for col in WORKLOAD_MEASURES
+        }, index=incidence.index)
+        credited.insert(0, 'Instructor', incidence['Instructor'])
+        credited.insert(0, 'Term', self.sections['Term'].to_numpy()[section])
+        return credited
+
+    def totals(self, weighting='shared'):
+        """
+        Returns every instructor's credited Sections, Contact Hours, FTE Count,
+        Calculated FTE and Generated FTE per term, plus their team-taught section count.
+        """
+        credited = self._credited(self.incidence, weighting)
+        credited['Team-Taught Sections'] = (self.instructor_counts[self.incidence['Section'].to_numpy()] > 1).astype(np.int64)
+        totals = credited.groupby(['Term', 'Instructor'], observed=True, sort=False).sum()
+        totals = totals.round({'Sections': 2, 'Contact Hours': 2, 'FTE Count': 2, 'Calculated FTE': 3, 'Generated FTE': 2})
+        return totals.sort_values('Generated FTE', ascending=False).reset_index()
+
+    def instructor_sections(self, instructor, weighting='shared'):
+        """
+        Returns the sections credited to one instructor (exact name from
+        instructors), with each section's instructor count, share and credited measures.
+        """
+        incidence = self.incidence[self.incidence['Instructor'] == instructor]
+        credited = self._credited(incidence, weighting).drop(columns=['Instructor', 'Sections'])
+        section = incidence['Section'].to_numpy()
+        for position, col in enumerate(['Sec Name', 'Course Code', 'Sec Divisions']):
+            credited.insert(1 + position, col, self.sections[col].to_numpy()[section])
+        credited.insert(4, 'Instructors', self.instructor_counts[section])
+        credited.insert(5, 'Share', incidence['Share'].to_numpy() if weighting == 'shared' else 1.0)
+        return credited.round({'Share': 4, 'Contact Hours': 2, 'FTE Count': 2, 'Calculated FTE': 3, 'Generated FTE': 2}).reset_index(drop=True)
@@ -0,0 +1,121 @@
+import argparse
+import datetime
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
+import pyarrow.parquet as pq
+
+
+# Root of the on-disk CSAR history: <root>/term=<Term>/snapshot=<YYYY-MM-DD>/part-*.parquet
+HISTORY_DIR = "csar_history"
+
+
+def _partition_dir(root, term, snapshot_date):
+    return os.path.join(root, f"term={term}", f"snapshot={snapshot_date}")
+
+
+def _stored_sections(partition_dir):
+    # Only the key column is read, so checking for duplicates stays cheap
+    if not os.path.isdir(partition_dir):
+        return set()
+    table = ds.dataset(partition_dir, format="parquet").to_table(columns=["Sec Name"])
+    return set(table.column("Sec Name").to_pylist())
+
+
+def ingest_snapshot(df, snapshot_date=None, root=HISTORY_DIR):
+    """
+    Appends a loaded CSAR frame to the history store as one partition per term.
+
+    Sections already stored for that term and snapshot date are skipped. Every
+    row of a new section (one per meeting pattern, with its room and instructor)
+    goes into a fresh part file, so existing history is never rewritten.
+    Returns the number of sections added per term.
+    """
+    snapshot_date = str(snapshot_date or datetime.date.today().isoformat())
+
+    added = {}
+    for term, term_df in df.groupby("Term", sort=False, observed=True):
+        partition_dir = _partition_dir(root, term, snapshot_date)
+        new_rows = term_df[~term_df["Sec Name"].isin(_stored_sections(partition_dir))]
+        added[term] = new_rows["Sec Name"].nunique()
+        if new_rows.empty:
+            continue
+
+        # Text, categorical and flag columns are written as strings (even when a
+        # part has only blanks), so every part file of the store shares one schema
+        text_columns = new_rows.select_dtypes(exclude="number").columns
+        new_rows = new_rows.astype({col: "string" for col in text_columns})
+
+        os.makedirs(partition_dir, exist_ok=True)
+        table = pa.Table.from_pandas(new_rows, preserve_index=False)
+        pq.write_table(table, os.path.join(partition_dir, f"part-{uuid.uuid4().hex}.parquet"))
+
+    return added
+
+
+def list_snapshots(root=HISTORY_DIR):
+    """
+    Returns a frame of every stored (Term, Snapshot Date) partition, newest first.
+    """
+    rows = []
+    if os.path.isdir(root):
+        for term_dir in os.listdir(root):
+            if not term_dir.startswith("term="):
+                continue
+            for snapshot_dir in os.listdir(os.path.join(root, term_dir)):
+                if snapshot_dir.startswith("snapshot="):
+                    rows.append({"Term": term_dir[len("term="):], "Snapshot Date": snapshot_dir[len("snapshot="):]})
+
+    snapshots = pd.DataFrame(rows, columns=["Term", "Snapshot Date"])
+    return snapshots.sort_values(["Snapshot Date", "Term"], ascending=False, ignore_index=True)
+
+
+def read_history(root=HISTORY_DIR, terms=None, snapshots=None, columns=None):
+    """
+    Reads stored snapshots as one frame with a 'Snapshot Date' column.
+
+    Only the partitions matching terms/snapshots and the requested columns are
+    read from disk; the Parquet files are memory-mapped.
+    """
+    dataset = ds.dataset(
+        root,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("term", pa.string()), ("snapshot", pa.string())]), flavor="hive"),
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+    expression = None
+    if terms is not None:
+        expression = ds.field("term").isin([str(term) for term in terms])
+    if snapshots is not None:
+        snapshot_filter = ds.field("snapshot").isin([str(snapshot) for snapshot in snapshots])
+        expression = snapshot_filter if expression is None else expression & snapshot_filter
+
+    if columns is not None:
+        columns = [col for col in columns if col != "Snapshot Date"] + ["snapshot"]
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    df = table.to_pandas()
+    return df.drop(columns=["term"], errors="ignore").rename(columns={"snapshot": "Snapshot Date"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add a daily CSAR file to the snapshot history store.")
+    parser.add_argument("csv_file", help="Dean's daily CSAR export (csv)")
+    parser.add_argument("--date", help="Snapshot date (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--root", default=HISTORY_DIR, help="History store directory")
+    args = parser.parse_args()
+
+    from streamlitapp import read_spreadsheets
+
+    added = ingest_snapshot(read_spreadsheets(args.csv_file), args.date, args.root)
+    for term, count in added.items():
+        print(f"{term}: {count} new sections")
+
+
+if __name__ == "__main__":
+    main()
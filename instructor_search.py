@@ -0,0 +1,155 @@
+import bisect
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+# Columns searched; the first one supplies the names offered in the picker
+SEARCH_COLUMNS = ['Sec Faculty Info', 'Sec All Faculty Last Names']
+
+# Names offered for a query (prefix matches first, then fuzzy ones)
+SUGGESTION_LIMIT = 25
+
+# Share of the query's trigrams a name must contain to count as a fuzzy match
+FUZZY_MIN_SCORE = 0.5
+
+# Faculty lists cut off by the export end in "(more)"
+_MORE_MARKER = re.compile(r'\(more\)\s*$', re.IGNORECASE)
+_SEPARATORS = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_name(name):
+    """
+    Lower-cases a name, drops accents, apostrophes and the "(more)" marker and
+    collapses punctuation to single spaces: "O'Brien, M. St. John" -> "obrien m st john".
+    """
+    name = unicodedata.normalize('NFKD', _MORE_MARKER.sub('', str(name)))
+    name = ''.join(char for char in name if not unicodedata.combining(char)).lower()
+    name = name.replace("'", '').replace('’', '')
+    return _SEPARATORS.sub(' ', name).strip()
+
+
+def _trigrams(text):
+    # Padded so word starts and ends count as grams too
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _distinct(column):
+    # Distinct values and a per-row code (-1 for missing), without expanding categories
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return list(column.cat.categories), column.cat.codes.to_numpy()
+    codes, values = pd.factorize(column)
+    return list(values), codes
+
+
+class InstructorSearch:
+    """
+    Prefix and fuzzy lookup of instructors, returning row positions.
+
+    Every distinct normalized name from the searched columns is one entry with
+    the sorted row positions it appears on. Prefix lookup bisects a sorted list
+    of the entries' word-start suffixes, so "smi", "j smith" and "smith j" each
+    match names containing words starting that way. Fuzzy lookup counts shared
+    trigrams through an inverted index of trigram -> entries.
+    """
+
+    def __init__(self, df):
+        entry_ids = {}
+        self.names = []  # display name per entry (first spelling seen)
+        self.faculty_names = []
+        pairs = []
+
+        for column in SEARCH_COLUMNS:
+            values, codes = _distinct(df[column])
+            value_entry = np.empty(len(values), dtype=np.int64)
+            for code, value in enumerate(values):
+                key = normalize_name(value)
+                if key not in entry_ids:
+                    entry_ids[key] = len(self.names)
+                    self.names.append(str(value).strip())
+                value_entry[code] = entry_ids[key] if key else -1
+                if column == SEARCH_COLUMNS[0] and key:
+                    self.faculty_names.append(str(value).strip())
+
+            rows = np.flatnonzero(codes >= 0)
+            entries = value_entry[codes[rows]]
+            pairs.append((entries[entries >= 0], rows[entries >= 0]))
+
+        # Row positions grouped by entry (CSR layout), without duplicates
+        entries = np.concatenate([entries for entries, _ in pairs])
+        rows = np.concatenate([rows for _, rows in pairs])
+        combined = np.unique(entries * max(len(df), 1) + rows)
+        self._rows = combined % max(len(df), 1)
+        self._row_starts = np.searchsorted(combined // max(len(df), 1), np.arange(len(self.names) + 1))
+
+        keys = list(entry_ids)
+        suffixes = sorted(
+            (key[match.start():], entry)
+            for key, entry in entry_ids.items() if key
+            for match in re.finditer(r'\S+', key)
+        )
+        self._suffixes = [suffix for suffix, _ in suffixes]
+        self._suffix_entries = np.array([entry for _, entry in suffixes], dtype=np.int64)
+
+        postings = {}
+        self._gram_counts = np.zeros(len(keys), dtype=np.int64)
+        for entry, key in enumerate(keys):
+            grams = _trigrams(key) if key else set()
+            self._gram_counts[entry] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(entry)
+        self._postings = {gram: np.array(entries, dtype=np.int64) for gram, entries in postings.items()}
+        self.faculty_names.sort(key=str.lower)
+
+    def _prefix_entries(self, key):
+        lo = bisect.bisect_left(self._suffixes, key)
+        hi = bisect.bisect_left(self._suffixes, key + '\U0010ffff')
+        return np.unique(self._suffix_entries[lo:hi])
+
+    def _fuzzy_entries(self, key):
+        # Entries ranked by the share of the query's trigrams they contain, then
+        # by how much of the entry the query covers (Dice coefficient)
+        grams = [self._postings[gram] for gram in _trigrams(key) if gram in self._postings]
+        if not grams:
+            return np.array([], dtype=np.int64)
+        query_count = len(_trigrams(key))
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.names))
+        score = shared / query_count
+        dice = 2 * shared / (query_count + self._gram_counts)
+        candidates = np.flatnonzero(score >= FUZZY_MIN_SCORE)
+        return candidates[np.lexsort((-dice[candidates], -score[candidates]))]
+
+    def rows(self, query, fuzzy=False):
+        """
+        Returns the sorted row positions of every name with words starting with
+        the query (an exact name matches itself and any list it appears in).
+        With fuzzy, names that share enough of the query's trigrams to be a
+        misspelling of it match as well.
+        """
+        key = normalize_name(query)
+        if not key:
+            return np.array([], dtype=np.intp)
+        entries = self._prefix_entries(key)
+        if fuzzy:
+            entries = np.union1d(entries, self._fuzzy_entries(key))
+        if not len(entries):
+            return np.array([], dtype=np.intp)
+        rows = [self._rows[self._row_starts[entry]:self._row_starts[entry + 1]] for entry in entries]
+        return np.unique(np.concatenate(rows)).astype(np.intp)
+
+    def suggest(self, query, limit=SUGGESTION_LIMIT):
+        """
+        Returns up to limit names for a query: prefix matches (shortest first),
+        then fuzzy matches for misspellings.
+        """
+        key = normalize_name(query)
+        if not key:
+            return []
+        prefix = self._prefix_entries(key)
+        prefix = sorted(prefix, key=lambda entry: (len(self.names[entry]), self.names[entry].lower()))
+        seen = set(prefix)
+        fuzzy = [entry for entry in self._fuzzy_entries(key)[:limit] if entry not in seen]
+        return [self.names[entry] for entry in (prefix + fuzzy)[:limit]]
@@ -0,0 +1,184 @@
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+
+# Set to a file path (or "-" for stderr) to write one JSON line per stage and cache event
+PERF_LOG_ENV = "CSAR_PERF_LOG"
+
+# Set to 1 to trace peak memory per stage from startup (it slows allocation-heavy
+# stages several-fold, so it is off unless asked for)
+TRACE_MEMORY_ENV = "CSAR_TRACE_MEMORY"
+
+# How many recent stage timings are kept for the debug panel
+RECENT_STAGES = 500
+
+logger = logging.getLogger("csar.perf")
+
+_lock = threading.Lock()
+_recent = deque(maxlen=RECENT_STAGES)
+_stage_totals = {}  # stage -> {"calls", "seconds", "max_seconds", "max_peak_mb"}
+_cache_counts = {}  # cache name -> {"lookups", "misses"}
+_local = threading.local()
+
+
+def _configure_log():
+    target = os.environ.get(PERF_LOG_ENV)
+    if not target or logger.handlers:
+        return
+    handler = logging.StreamHandler() if target == "-" else logging.FileHandler(target)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def _log(record):
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps(record, default=str))
+
+
+def set_memory_tracing(enabled):
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def memory_tracing():
+    return tracemalloc.is_tracing()
+
+
+@contextlib.contextmanager
+def stage(name, **fields):
+    """
+    Times the enclosed block (and, while memory tracing is on, its peak traced
+    allocation) and records it under name. Extra fields (entity, rows, ...) go
+    into the JSON log line.
+
+    tracemalloc is process-wide, so a stage's peak also includes whatever other
+    threads allocated at the same time.
+    """
+    # Nested stages reset the tracemalloc peak, so each open stage keeps the
+    # highest peak seen before its children reset it
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        entry = [current, current]
+    else:
+        entry = [0, 0]
+    stack.append(entry)
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+
+        record = {"event": "stage", "stage": name, "seconds": round(seconds, 6)}
+        if tracing and tracemalloc.is_tracing():
+            peak = max(entry[1], tracemalloc.get_traced_memory()[1])
+            record["peak_mb"] = round((peak - entry[0]) / 1e6, 3)
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+        record["thread"] = threading.current_thread().name
+        record.update(fields)
+
+        with _lock:
+            totals = _stage_totals.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "max_peak_mb": None})
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            totals["max_seconds"] = max(totals["max_seconds"], seconds)
+            if "peak_mb" in record:
+                totals["max_peak_mb"] = max(totals["max_peak_mb"] or 0.0, record["peak_mb"])
+            _recent.append(record)
+        _log(record)
+
+
+def count_lookup(cache):
+    with _lock:
+        _cache_counts.setdefault(cache, {"lookups": 0, "misses": 0})["lookups"] += 1
+
+
+def count_miss(cache):
+    # Called from inside the code that runs only on a miss (e.g. a cached function body)
+    with _lock:
+        _cache_counts.setdefault(cache, {"lookups": 0, "misses": 0})["misses"] += 1
+    _log({"event": "cache_miss", "cache": cache})
+
+
+def count_cache(cache, hit):
+    # For caches that know the outcome at lookup time
+    count_lookup(cache)
+    if not hit:
+        count_miss(cache)
+
+
+def stage_summary():
+    """
+    Returns one row per stage: calls, total/mean/max seconds and max peak MB.
+    """
+    with _lock:
+        items = [(name, dict(totals)) for name, totals in _stage_totals.items()]
+    rows = []
+    for name, totals in items:
+        rows.append({
+            "Stage": name,
+            "Calls": totals["calls"],
+            "Total Seconds": round(totals["seconds"], 4),
+            "Mean Seconds": round(totals["seconds"] / totals["calls"], 4),
+            "Max Seconds": round(totals["max_seconds"], 4),
+            "Max Peak MB": totals["max_peak_mb"],
+        })
+    return sorted(rows, key=lambda row: row["Total Seconds"], reverse=True)
+
+
+def cache_summary():
+    """
+    Returns one row per cache: lookups, hits, misses and hit rate.
+    """
+    with _lock:
+        items = [(name, dict(counts)) for name, counts in _cache_counts.items()]
+    rows = []
+    for name, counts in sorted(items):
+        # A miss can be counted without a matching lookup (e.g. a direct build)
+        lookups = max(counts["lookups"], counts["misses"])
+        hits = lookups - counts["misses"]
+        rows.append({
+            "Cache": name,
+            "Lookups": lookups,
+            "Hits": hits,
+            "Misses": counts["misses"],
+            "Hit Rate": round(hits / lookups, 3) if lookups else None,
+        })
+    return rows
+
+
+def recent_stages():
+    with _lock:
+        return list(_recent)
+
+
+def reset():
+    with _lock:
+        _recent.clear()
+        _stage_totals.clear()
+        _cache_counts.clear()
+
+
+_configure_log()
+if os.environ.get(TRACE_MEMORY_ENV) == "1":
+    set_memory_tracing(True)
@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+
+# Meeting Times is fixed-width text, e.g.
+# "01/13/25 03/10/25 ATC  209      CLAS T         10:00AM 10:50AM"
+# "01/13/25 05/14/25 DED  INET     CLAS MTWTHFSSU TBA            "
+MEETING_PATTERN = (
+    r'^(?P<start_date>\d\d/\d\d/\d\d) (?P<end_date>\d\d/\d\d/\d\d) '
+    r'(?P<building>\S+) +(?P<room>\S+) +(?P<meeting_type>\S+) +(?P<days>\S+) +'
+    r'(?:(?P<start_time>\d\d:\d\d[AP]M) (?P<end_time>\d\d:\d\d[AP]M)|TBA)'
+)
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Day codes as they appear in the days field; TH and SU must be matched before T and S
+_DAY_CODES = [('TH', 3), ('SU', 6), ('M', 0), ('T', 1), ('W', 2), ('F', 4), ('S', 5)]
+
+# Placeholder building/room codes that don't identify a real room
+UNASSIGNED_ROOMS = ['TBA']
+
+# Default teaching day for utilization: 7:00 AM to 10:00 PM, Monday to Friday
+DAY_START_MINUTE = 7 * 60
+DAY_END_MINUTE = 22 * 60
+
+
+def _day_mask(days):
+    # "MTWTHFSSU" -> bit per weekday (Mon = bit 0)
+    mask = 0
+    position = 0
+    while position < len(days):
+        for code, weekday in _DAY_CODES:
+            if days.startswith(code, position):
+                mask |= 1 << weekday
+                position += len(code)
+                break
+        else:
+            position += 1
+    return mask
+
+
+def _minutes(times):
+    # "10:00AM" -> 600; unparsed (TBA) times stay NaN
+    clock = times.str.extract(r'(\d\d):(\d\d)([AP])M')
+    hours = pd.to_numeric(clock[0]) % 12 + np.where(clock[2].eq('P').fillna(False), 12, 0)
+    return hours * 60 + pd.to_numeric(clock[1])
+
+
+def parse_meeting_times(meeting_times):
+    """
+    Splits a Meeting Times column into structured columns (dates, building,
+    room, meeting type, days, weekday bitmask, start/end minute after midnight).
+    Rows that don't parse, and TBA times, come back as missing values.
+    """
+    # A categorical column is parsed once per distinct value, then expanded by code
+    if isinstance(meeting_times.dtype, pd.CategoricalDtype):
+        distinct = pd.Series(list(meeting_times.cat.categories) + [None], dtype='string')
+        codes = meeting_times.cat.codes.to_numpy().copy()
+        codes[codes < 0] = len(distinct) - 1
+        parsed = parse_meeting_times(distinct).iloc[codes]
+        parsed.index = meeting_times.index
+        return parsed
+
+    parts = meeting_times.astype('string').str.extract(MEETING_PATTERN)
+
+    # Only a handful of distinct day strings exist, so decode each once
+    days = parts['days'].astype('category')
+    day_masks = np.array([_day_mask(code) for code in days.cat.categories], dtype=np.uint8)
+    codes = days.cat.codes.to_numpy()
+    day_mask = np.where(codes >= 0, day_masks[codes] if len(day_masks) else 0, 0).astype(np.uint8)
+
+    return pd.DataFrame({
+        'Meeting Start Date': pd.to_datetime(parts['start_date'], format='%m/%d/%y'),
+        'Meeting End Date': pd.to_datetime(parts['end_date'], format='%m/%d/%y'),
+        'Building': parts['building'].astype('category'),
+        'Room': parts['room'].astype('category'),
+        'Meeting Type': parts['meeting_type'].astype('category'),
+        'Meeting Days': days,
+        'Day Mask': day_mask,
+        'Start Minute': _minutes(parts['start_time']),
+        'End Minute': _minutes(parts['end_time']),
+    }, index=meeting_times.index)
+
+
+def _clock(minutes):
+    minutes = np.asarray(minutes, dtype=int)
+    hours, mins = np.divmod(minutes, 60)
+    suffix = np.where(hours >= 12, 'PM', 'AM')
+    hours = np.where(hours % 12 == 0, 12, hours % 12)
+    return [f"{h:02d}:{m:02d}{s}" for h, m, s in zip(hours, mins, suffix)]
+
+
+class RoomSchedule:
+    """
+    Interval index of timed, in-person meetings by building, room and weekday,
+    for room utilization, conflict and peak occupancy queries over a term.
+    Meetings whose end time isn't after their start are left out and listed in
+    invalid_meetings.
+    """
+
+    def __init__(self, df):
+        meetings = parse_meeting_times(df['Meeting Times'])
+        meetings['Sec Name'] = df['Sec Name'].to_numpy()
+        meetings['Row'] = np.arange(len(df))
+
+        # Online/TBA meetings have no clock time and don't occupy a room
+        meetings = meetings[meetings['Start Minute'].notna() & meetings['End Minute'].notna()]
+        meetings = meetings[meetings['Day Mask'] > 0]
+        meetings = meetings[~meetings['Building'].isin(UNASSIGNED_ROOMS) & ~meetings['Room'].isin(UNASSIGNED_ROOMS)]
+
+        # A meeting ending at or before its start ("08:00PM 09:50AM", usually a
+        # mistyped AM/PM) has no usable interval; it is set aside for review
+        # rather than booking a negative span
+        inverted = (meetings['End Minute'] <= meetings['Start Minute']).to_numpy()
+        invalid = meetings[inverted]
+        self.invalid_meetings = pd.DataFrame({
+            'Sec Name': invalid['Sec Name'].to_numpy(),
+            'Building': invalid['Building'].to_numpy(),
+            'Room': invalid['Room'].to_numpy(),
+            'Meeting Times': df['Meeting Times'].to_numpy()[invalid['Row'].to_numpy()],
+        })
+        meetings = meetings[~inverted]
+
+        # One interval per (meeting, weekday), sorted by room, weekday and start
+        weekday_bits = (meetings['Day Mask'].to_numpy()[:, None] >> np.arange(7)) & 1
+        meeting_pos, weekday = np.nonzero(weekday_bits)
+        intervals = meetings.iloc[meeting_pos].reset_index(drop=True)
+        intervals['Weekday'] = weekday.astype(np.int8)
+        intervals['Start Minute'] = intervals['Start Minute'].astype(np.int16)
+        intervals['End Minute'] = intervals['End Minute'].astype(np.int16)
+
+        # Identical copies of the same section meeting (duplicate CSAR rows) count once
+        intervals = intervals.drop_duplicates(subset=['Sec Name', 'Building', 'Room', 'Weekday', 'Start Minute', 'End Minute'])
+        self.intervals = intervals.sort_values(['Building', 'Room', 'Weekday', 'Start Minute'], ignore_index=True)
+
+    def _active(self, on_date=None, weekdays=None):
+        intervals = self.intervals
+        if on_date is not None:
+            on_date = pd.Timestamp(on_date)
+            intervals = intervals[(intervals['Meeting Start Date'] <= on_date) & (intervals['Meeting End Date'] >= on_date)]
+        if weekdays is not None:
+            intervals = intervals[intervals['Weekday'].isin(list(weekdays))]
+        return intervals
+
+    def room_utilization(self, on_date=None, weekdays=range(5), day_start=DAY_START_MINUTE, day_end=DAY_END_MINUTE):
+        """
+        Returns booked minutes and utilization per building/room. Overlapping
+        bookings are merged first, so a room is never more than 100% used.
+        """
+        intervals = self._active(on_date, weekdays)
+        start = intervals['Start Minute'].clip(day_start, day_end).to_numpy(dtype=np.int32)
+        end = intervals['End Minute'].clip(day_start, day_end).to_numpy(dtype=np.int32)
+
+        # Union of intervals per (room, weekday): intervals are sorted by start,
+        # so only the part beyond the running max end of earlier ones is new time
+        group = intervals.groupby(['Building', 'Room', 'Weekday'], observed=True, sort=False).ngroup().to_numpy()
+        prior_end = pd.Series(end).groupby(group).cummax().groupby(group).shift(fill_value=day_start).to_numpy()
+        booked = np.maximum(end - np.maximum(start, prior_end), 0)
+
+        result = (
+            pd.DataFrame({'Building': intervals['Building'], 'Room': intervals['Room'], 'Booked Minutes': booked})
+            .groupby(['Building', 'Room'], observed=True)['Booked Minutes'].sum()
+            .reset_index()
+        )
+        available = (day_end - day_start) * (len(list(weekdays)) if weekdays is not None else 7)
+        result['Utilization'] = (result['Booked Minutes'] / available).round(4)
+        return result.sort_values('Utilization', ascending=False, ignore_index=True)
+
+    def conflicts(self, on_date=None):
+        """
+        Returns pairs of different sections booked into the same room on the same
+        weekday at overlapping times, with overlapping date ranges.
+        """
+        intervals = self._active(on_date)[[
+            'Building', 'Room', 'Weekday', 'Start Minute', 'End Minute',
+            'Meeting Start Date', 'Meeting End Date', 'Sec Name',
+        ]]
+        pairs = intervals.merge(intervals, on=['Building', 'Room', 'Weekday'], suffixes=('', ' Other'))
+        overlap = (
+            (pairs['Sec Name'] < pairs['Sec Name Other'])
+            & (pairs['Start Minute'] < pairs['End Minute Other'])
+            & (pairs['Start Minute Other'] < pairs['End Minute'])
+            & (pairs['Meeting Start Date'] <= pairs['Meeting End Date Other'])
+            & (pairs['Meeting Start Date Other'] <= pairs['Meeting End Date'])
+        )
+        pairs = pairs[overlap]
+        return pd.DataFrame({
+            'Building': pairs['Building'].to_numpy(),
+            'Room': pairs['Room'].to_numpy(),
+            'Weekday': np.array(WEEKDAYS)[pairs['Weekday'].to_numpy()],
+            'Sec Name': pairs['Sec Name'].to_numpy(),
+            'Time': [f"{a}-{b}" for a, b in zip(_clock(pairs['Start Minute']), _clock(pairs['End Minute']))],
+            'Conflicts With': pairs['Sec Name Other'].to_numpy(),
+            'Other Time': [f"{a}-{b}" for a, b in zip(_clock(pairs['Start Minute Other']), _clock(pairs['End Minute Other']))],
+        })
+
+    def peak_occupancy(self, on_date=None, slot_minutes=30, day_start=DAY_START_MINUTE, day_end=DAY_END_MINUTE):
+        """
+        Returns the number of rooms in use per weekday and time slot (rows are
+        slot start times, columns weekdays).
+        """
+        intervals = self._active(on_date)
+        # Several sections sharing a room at once (e.g. cross-listed) occupy it once
+        intervals = intervals.drop_duplicates(subset=['Building', 'Room', 'Weekday', 'Start Minute', 'End Minute'])
+
+        n_slots = -(-(day_end - day_start) // slot_minutes)
+        first = ((intervals['Start Minute'].to_numpy() - day_start) // slot_minutes).clip(0, n_slots)
+        last = (-(-(intervals['End Minute'].to_numpy() - day_start) // slot_minutes)).clip(0, n_slots)
+
+        # Difference array: +1 at the first slot, -1 after the last, then a running sum
+        diff = np.zeros((7, n_slots + 1), dtype=np.int32)
+        weekday = intervals['Weekday'].to_numpy()
+        np.add.at(diff, (weekday, first), 1)
+        np.add.at(diff, (weekday, last), -1)
+        occupancy = np.cumsum(diff, axis=1)[:, :n_slots]
+
+        slots = _clock(day_start + np.arange(n_slots) * slot_minutes)
+        return pd.DataFrame(occupancy.T, index=pd.Index(slots, name='Time'), columns=WEEKDAYS)
@@ -0,0 +1,138 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from sections import SECTION_KEY, first_section_rows
+
+
+# Dimensions of the cube, coarsest first; 'Sec Name' is the leaf level below them
+CUBE_DIMENSIONS = ['Term', 'Sec Divisions', 'Course Prefix', 'Course Code', 'Sec Faculty Info', 'X Sec Delivery Method']
+SECTION_LEVEL = 'Sec Name'
+
+# Additive measures; Sections counts each section once
+CUBE_MEASURES = ['Sections', 'Capacity', 'FTE Count', 'Calculated FTE', 'Generated FTE']
+
+# Drill-down paths offered in the explorer: name -> levels, top to bottom
+DRILL_PATHS = {
+    'Division > Course > Section': ['Sec Divisions', 'Course Code', SECTION_LEVEL],
+    'Division > Prefix > Course > Instructor': ['Sec Divisions', 'Course Prefix', 'Course Code', 'Sec Faculty Info'],
+    'Term > Division > Delivery Method': ['Term', 'Sec Divisions', 'X Sec Delivery Method'],
+    'Instructor > Course > Section': ['Sec Faculty Info', 'Course Code', SECTION_LEVEL],
+}
+
+
+def _section_rows(df):
+    # One row per section; dimension values are kept as stripped strings, so
+    # frames of different loads combine
+    first = first_section_rows(df[SECTION_KEY])
+    sections = pd.DataFrame({
+        col: df.loc[first, col].astype('string').str.strip().fillna('').to_numpy()
+        for col in CUBE_DIMENSIONS + [SECTION_LEVEL]
+    })
+    sections['Sections'] = 1
+    for col in CUBE_MEASURES[1:]:
+        sections[col] = df.loc[first, col].to_numpy(dtype=float)
+    return sections
+
+
+def _rollup(rows, dims):
+    # Sums the measures per combination of dims (one total row without dims)
+    if not dims:
+        return rows[CUBE_MEASURES].sum().to_frame().T
+    return rows.groupby(list(dims), sort=False)[CUBE_MEASURES].sum()
+
+
+class OlapCube:
+    """
+    Materialized rollups of Sections, Capacity, FTE Count, Calculated FTE and
+    Generated FTE over term, division, prefix, course, instructor and delivery
+    method.
+
+    The base cells hold one row per distinct combination of all six
+    dimensions. Any coarser rollup (a cuboid) is summed from the cells on first
+    use and kept, so slices and drill-downs are answered from pre-aggregates;
+    only the section level reads the per-section rows. Each section counts
+    once, like the course and instructor reports (FTE by Division sums every
+    meeting row instead).
+
+    update() swaps in a new snapshot of one or more terms: the cells and every
+    kept cuboid subtract the old term's aggregates and add the new ones.
+    """
+
+    def __init__(self, df=None):
+        if df is None:
+            df = pd.DataFrame(columns=CUBE_DIMENSIONS + [SECTION_LEVEL] + CUBE_MEASURES[1:])
+        self.snapshots = {}  # term -> label of the snapshot it was built from
+        self._sections = _section_rows(df)
+        self._cells = _rollup(self._sections, CUBE_DIMENSIONS)
+        self._cuboids = {}  # sorted dims -> rollup
+        self._lock = threading.Lock()
+
+    def _cuboid(self, dims):
+        key = tuple(sorted(dims, key=CUBE_DIMENSIONS.index))
+        with self._lock:
+            cuboid = self._cuboids.get(key)
+            if cuboid is None:
+                cuboid = self._cuboids[key] = _rollup(self._cells.reset_index(), key)
+            return cuboid
+
+    def rollup(self, by=(), filters=None):
+        """
+        Returns the measures per combination of the by levels, restricted to
+        filters ({level: value or list of values}), plus Enrollment Per.
+        """
+        by = list(by)
+        filters = {level: [values] if isinstance(values, str) else list(values) for level, values in (filters or {}).items()}
+        for level in by + list(filters):
+            if level not in CUBE_DIMENSIONS and level != SECTION_LEVEL:
+                raise ValueError(f"Unknown cube level: {level}")
+
+        if SECTION_LEVEL in by or SECTION_LEVEL in filters:
+            with self._lock:
+                rows = self._sections
+        else:
+            rows = self._cuboid(set(by) | set(filters)).reset_index()
+
+        mask = np.ones(len(rows), dtype=bool)
+        for level, values in filters.items():
+            mask &= rows[level].isin(values).to_numpy()
+        result = _rollup(rows[mask], by)
+
+        result = result[result['Sections'] > 0] if by else result
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result['Enrollment Per'] = np.where(result['Capacity'] > 0, result['FTE Count'] / result['Capacity'], 0.0).round(4)
+        result = result.round({'Calculated FTE': 3, 'Generated FTE': 2}).astype({'Sections': np.int64})
+        return result.sort_values('Generated FTE', ascending=False) if by else result
+
+    def update(self, df, label=None):
+        """
+        Replaces the terms found in df with its sections (a new snapshot of those
+        terms), updating the cells and kept cuboids in place of a rebuild.
+        """
+        new_sections = _section_rows(df)
+        terms = list(pd.unique(new_sections['Term']))
+        new_cells = _rollup(new_sections, CUBE_DIMENSIONS)
+
+        with self._lock:
+            replaced = self._sections['Term'].isin(terms).to_numpy()
+            old_cells = _rollup(self._sections[replaced], CUBE_DIMENSIONS)
+            self._sections = pd.concat([self._sections[~replaced], new_sections], ignore_index=True)
+            self._cells = _apply_change(self._cells, old_cells, new_cells, CUBE_DIMENSIONS)
+
+            for dims, cuboid in self._cuboids.items():
+                old = _rollup(old_cells.reset_index(), dims)
+                new = _rollup(new_cells.reset_index(), dims)
+                self._cuboids[dims] = _apply_change(cuboid, old, new, dims)
+
+            for term in terms:
+                self.snapshots[term] = label
+
+
+def _apply_change(current, old, new, dims):
+    # current - old + new, dropping combinations left without sections (the
+    # grand total row of a rollup without dims always stays)
+    updated = current.sub(old, fill_value=0).add(new, fill_value=0)
+    if dims:
+        updated = updated[updated['Sections'] > 0]
+    return updated.round({'Calculated FTE': 3, 'Generated FTE': 2})
@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+import pyarrow as pa
+
+from instrumentation import count_lookup, count_miss, stage
+
+
+# Local only: other offices' tools on this machine read from it, nothing writes
+API_HOST = "127.0.0.1"
+API_PORT = 8765
+
+# Set to a port number to serve the API there, or to 0 to not start it with the app
+API_PORT_ENV = "CSAR_API_PORT"
+
+# Report tables are computed and encoded on these threads, off the event loop
+API_WORKERS = 4
+
+# Encoded responses kept in memory (least recently used are evicted first)
+RESPONSE_CACHE_ENTRIES = 1024
+
+# Published datasets served; requests without ?dataset= get the latest one
+API_DATASET_ENTRIES = 8
+
+# Longest request line plus headers accepted (the API takes no request bodies)
+MAX_REQUEST_HEAD = 16 * 1024
+
+REPORT_KINDS = ('division', 'course', 'enrollment', 'instructor')
+
+RESPONSE_FORMATS = {
+    'json': "application/json",
+    'arrow': "application/vnd.apache.arrow.stream",
+}
+
+# Responses for a pinned ?dataset= version never change; the latest one is revalidated
+PINNED_CACHE_CONTROL = "private, max-age=86400, immutable"
+LATEST_CACHE_CONTROL = "no-cache"
+
+_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def _error_body(message):
+    return json.dumps({'error': message}).encode()
+
+
+def encode_report(report_df, fields, export_format):
+    """
+    Encodes a report table as JSON ({fields..., "totals", "rows": [...]}) or as an
+    Arrow IPC stream with the fields and totals in the schema metadata.
+    """
+    totals = {'Generated FTE': float(report_df['Generated FTE'].sum())} if 'Generated FTE' in report_df else {}
+    if export_format == 'arrow':
+        table = pa.Table.from_pandas(report_df, preserve_index=False)
+        metadata = {key: json.dumps(value) for key, value in fields.items()}
+        table = table.replace_schema_metadata({**metadata, 'totals': json.dumps(totals)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    # The rows are serialized by pandas and spliced in rather than round-tripped
+    head = json.dumps({**fields, 'totals': totals})
+    return f'{head[:-1]}, "rows": {report_df.to_json(orient="records")}}}'.encode()
+
+
+class QueryAPI:
+    """
+    Read-only HTTP API over the report tables of published datasets:
+
+        GET /datasets                      published dataset versions
+        GET /<kind>                        the divisions, courses or instructors of a dataset
+        GET /<kind>/<entity>               one report table
+
+    where kind is division, course, enrollment or instructor. ?dataset=<version>
+    pins a dataset (the latest published one otherwise) and ?format=arrow (or an
+    Accept of the Arrow stream type) returns Arrow IPC instead of JSON.
+
+    Connections are served by an asyncio event loop on its own thread; report
+    tables are computed and encoded on a small worker pool, and identical
+    requests in flight share one computation. A response is fully determined by
+    (dataset version, kind, entity, format), so that is its ETag: a matching
+    If-None-Match is answered with 304 before any work, and encoded bodies are
+    kept in an LRU cache.
+
+    compute_report(df, kind, entity) returns a report table or None, and
+    list_entities(df, kind) the entities of a kind; the app supplies both.
+    """
+
+    def __init__(self, compute_report, list_entities, host=API_HOST, port=API_PORT, workers=API_WORKERS):
+        self.host = host
+        self.port = port
+        self._compute_report = compute_report
+        self._list_entities = list_entities
+        self._datasets = OrderedDict()  # version -> DataFrame, latest last
+        self._responses = OrderedDict()  # ETag -> (status, body)
+        self._pending = {}  # ETag -> future of a response being built (event loop only)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="query-api")
+
+    def publish(self, version, df):
+        """
+        Serves df under version. A version published for the first time becomes
+        the latest dataset; publishing it again changes nothing, so sessions
+        still showing an older dataset don't move "latest" back to it.
+        """
+        if not version:
+            return
+        with self._lock:
+            if version in self._datasets:
+                return
+            self._datasets[version] = df
+            while len(self._datasets) > API_DATASET_ENTRIES:
+                self._datasets.popitem(last=False)
+
+    def start(self):
+        """
+        Starts serving on a daemon thread; returns once the port is bound (or
+        raises the OSError binding it failed with).
+        """
+        ready = threading.Event()
+        failure = []
+
+        def run():
+            try:
+                asyncio.run(self._serve(ready))
+            except OSError as e:
+                failure.append(e)
+                ready.set()
+
+        threading.Thread(target=run, name="query-api", daemon=True).start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+
+    def serve_forever(self):
+        asyncio.run(self._serve())
+
+    async def _serve(self, ready=None):
+        server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_REQUEST_HEAD)
+        self.port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+
+                request_line, *header_lines = head.decode('latin-1').split("\r\n")
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, http_version = request_line.split(' ')
+                except ValueError:
+                    method, target, http_version = None, '/', 'HTTP/1.0'
+
+                status, response_headers, body = await self._respond(method, target, headers)
+                keep_alive = http_version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                response_headers['Content-Length'] = str(len(body))
+                response_headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+                lines = [f"HTTP/1.1 {status} {_REASONS[status]}"] + [f"{name}: {value}" for name, value in response_headers.items()]
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+                if method != 'HEAD' and status != 304:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _json(self, status, body, extra_headers=None):
+        return status, {'Content-Type': RESPONSE_FORMATS['json'], **(extra_headers or {})}, body
+
+    async def _respond(self, method, target, headers):
+        if method is None:
+            return self._json(400, _error_body("Malformed request line"))
+        if method not in ('GET', 'HEAD'):
+            return self._json(405, _error_body("The API is read-only"), {'Allow': 'GET, HEAD'})
+
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        export_format = query.get('format') or ('arrow' if RESPONSE_FORMATS['arrow'] in headers.get('accept', '') else 'json')
+        if export_format not in RESPONSE_FORMATS:
+            return self._json(400, _error_body(f"Unsupported format: {export_format}"))
+
+        # The entity is decoded after splitting, so it may contain an encoded "/"
+        kind, _, entity = url.path.strip('/').partition('/')
+        kind, entity = unquote(kind), unquote(entity).strip() or None
+        if kind in ('', 'datasets'):
+            return self._json(200, self._dataset_listing(), {'Cache-Control': LATEST_CACHE_CONTROL})
+        if kind not in REPORT_KINDS:
+            return self._json(404, _error_body(f"Unknown report: {kind}"))
+
+        with self._lock:
+            version = query.get('dataset') or next(reversed(self._datasets), None)
+            df = self._datasets.get(version)
+        if df is None:
+            return self._json(404, _error_body(f"Unknown dataset: {version}" if version else "No dataset is published"))
+
+        key = "\0".join([version, kind, entity or '', export_format])
+        etag = f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+        response_headers = {
+            'ETag': etag,
+            'Cache-Control': PINNED_CACHE_CONTROL if 'dataset' in query else LATEST_CACHE_CONTROL,
+            'X-Dataset-Version': version,
+        }
+        if_none_match = headers.get('if-none-match', '')
+        if if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]:
+            return 304, response_headers, b""
+
+        count_lookup("api_response")
+        with self._lock:
+            cached = self._responses.get(etag)
+            if cached is not None:
+                self._responses.move_to_end(etag)
+        if cached is None:
+            future = self._pending.get(etag)
+            if future is None:
+                count_miss("api_response")
+                loop = asyncio.get_running_loop()
+                future = self._pending[etag] = loop.run_in_executor(
+                    self._executor, self._render, etag, df, version, kind, entity, export_format
+                )
+                future.add_done_callback(lambda _: self._pending.pop(etag, None))
+            try:
+                cached = await asyncio.shield(future)
+            except Exception as e:
+                return self._json(500, _error_body(f"Unexpected error: {e}"))
+
+        status, body = cached
+        if status != 200:
+            return self._json(status, body)
+        return status, {'Content-Type': RESPONSE_FORMATS[export_format], **response_headers}, body
+
+    def _dataset_listing(self):
+        with self._lock:
+            datasets = list(self._datasets.items())
+        listing = [
+            {'version': version, 'rows': len(df), 'terms': sorted(map(str, pd.unique(df['Term'].dropna())))}
+            for version, df in reversed(datasets)
+        ]
+        return json.dumps({'latest': listing[0]['version'] if listing else None, 'datasets': listing}).encode()
+
+    def _render(self, etag, df, version, kind, entity, export_format):
+        with stage("api.render", kind=kind, entity=entity, format=export_format):
+            if entity is None:
+                report_df = pd.DataFrame({'Entity': self._list_entities(df, kind)})
+            else:
+                report_df = self._compute_report(df, kind, entity)
+            if report_df is None:
+                response = (404, _error_body(f"No {kind} report for: {entity}"))
+            else:
+                fields = {'dataset': version, 'kind': kind, 'entity': entity}
+                response = (200, encode_report(report_df, fields, export_format))
+
+        with self._lock:
+            self._responses[etag] = response
+            while len(self._responses) > RESPONSE_CACHE_ENTRIES:
+                self._responses.popitem(last=False)
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the FTE report tables of CSAR exports as a read-only local API.")
+    parser.add_argument("csv_files", nargs="+", help="Dean's daily CSAR exports (csv); the last one is served by default")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS, help="Threads computing report tables")
+    args = parser.parse_args()
+
+    # Imported here: the app imports this module to serve the API alongside the UI
+    import streamlitapp
+
+    api = QueryAPI(streamlitapp.api_report, streamlitapp.api_entities, args.host, args.port, args.workers)
+    for csv_file in args.csv_files:
+        df = streamlitapp.load_dataset(csv_file)
+        streamlitapp.start_precompute(df)
+        api.publish(streamlitapp.dataset_version(df), df)
+        print(f"Serving {csv_file} as dataset {streamlitapp.dataset_version(df)}")
+    print(f"Query API on http://{args.host}:{args.port}/datasets")
+    api.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import tempfile
+import warnings
+
+import pandas as pd
+
+from instrumentation import count_cache, stage
+
+
+# Hardcoded reference tables that enrich every uploaded CSAR file
+CONTACT_HOURS_FILE = "contact_hours.xlsx"
+TIERS_FILE = "tiers.xlsx"
+
+# Compiled Parquet copies of the reference tables, plus a manifest per table
+REFERENCE_CACHE_DIR = ".reference_cache"
+
+
+class ReferenceTableWarning(UserWarning):
+    pass
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _compile_table(path, key_column, value_column):
+    # Parse the workbook once and keep only the normalized key -> value lookup
+    table = pd.read_excel(path, dtype=str)
+    table[key_column] = table[key_column].str.strip().str.upper()
+    table[value_column] = pd.to_numeric(table[value_column], errors='coerce')
+
+    name = os.path.basename(path)
+    missing_keys = table[key_column].isna() | (table[key_column] == "")
+    if missing_keys.any():
+        warnings.warn(f"{name}: {missing_keys.sum()} rows have no {key_column} and were dropped", ReferenceTableWarning)
+    table = table[~missing_keys]
+
+    missing_values = table.loc[table[value_column].isna(), key_column]
+    if not missing_values.empty:
+        warnings.warn(f"{name}: no numeric {value_column} for {', '.join(missing_values)}", ReferenceTableWarning)
+
+    duplicated = table.loc[table[key_column].duplicated(), key_column].unique()
+    if len(duplicated):
+        warnings.warn(
+            f"{name}: duplicated {key_column} values (first entry kept): {', '.join(duplicated)}",
+            ReferenceTableWarning,
+        )
+
+    return table.drop_duplicates(subset=key_column)[[key_column, value_column]].reset_index(drop=True)
+
+
+def load_reference_table(path, key_column, value_column, cache_dir=REFERENCE_CACHE_DIR):
+    """
+    Returns a reference workbook as a Series of value_column keyed on the
+    normalized key_column.
+
+    The workbook is compiled to Parquet on first use and again whenever its
+    mtime/size and content hash change; otherwise this is a memory-mapped
+    Parquet read.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    compiled_path = os.path.join(cache_dir, f"{stem}.parquet")
+    manifest_path = os.path.join(cache_dir, f"{stem}.json")
+
+    stat = os.stat(path)
+    source = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "columns": [key_column, value_column]}
+
+    manifest = None
+    if os.path.exists(manifest_path) and os.path.exists(compiled_path):
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+
+    fresh = manifest is not None and all(manifest.get(field) == value for field, value in source.items())
+    if not fresh:
+        # A touched but unchanged workbook only needs its manifest refreshed
+        source["sha256"] = _sha256(path)
+        if manifest is None or manifest.get("sha256") != source["sha256"] or manifest.get("columns") != source["columns"]:
+            fresh = False
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            try:
+                with stage("reference.compile", table=stem), os.fdopen(fd, "wb") as file:
+                    _compile_table(path, key_column, value_column).to_parquet(file, index=False)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            os.replace(tmp_path, compiled_path)
+        else:
+            fresh = True
+
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(source, file)
+        os.replace(tmp_path, manifest_path)
+
+    count_cache("reference_table", hit=fresh)
+    table = pd.read_parquet(compiled_path, memory_map=True)
+    return table.set_index(key_column)[value_column]
+
+
+def load_contact_hours(path=CONTACT_HOURS_FILE):
+    # contact_hours.xlsx is keyed by course code (e.g. ACA-120) in its 'Sec Name' column
+    return load_reference_table(path, 'Sec Name', 'Contact Hours')
+
+
+def load_tier_values(path=TIERS_FILE):
+    return load_reference_table(path, 'Prefix/Course ID', 'New Sector')
@@ -0,0 +1,92 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Row orders of recent (filter, sort) queries kept per view, so paging doesn't redo them
+QUERY_CACHE_ENTRIES = 8
+
+
+class ReportView:
+    """
+    Report rows held as an Arrow table on the server. Filtering, sorting and
+    totals are computed over the whole table with Arrow kernels; only the
+    requested page is converted back to pandas for display, so what reaches
+    the browser depends on the page size, not the report size.
+
+    Totals are separate aggregates over the filtered rows, not rows of the table.
+    """
+
+    def __init__(self, df, sum_columns=('Generated FTE',)):
+        table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+
+        # Categorical columns arrive as dictionaries, which the sort and string
+        # kernels don't take; the report is small enough to decode once
+        for position, field in enumerate(table.schema):
+            if pa.types.is_dictionary(field.type):
+                table = table.set_column(position, field.name, table.column(position).cast(field.type.value_type))
+        self.table = table
+        self.columns = table.column_names
+        self.sum_columns = [col for col in sum_columns if col in self.columns]
+        self._text_columns = [
+            field.name for field in table.schema
+            if pa.types.is_string(field.type) or pa.types.is_large_string(field.type)
+        ]
+
+        self._queries = OrderedDict()  # (filter, sort column, descending) -> row positions
+        self._lock = threading.Lock()
+
+    def _rows(self, filter_text, sort_by, descending):
+        query = (filter_text, sort_by, descending)
+        with self._lock:
+            if query in self._queries:
+                self._queries.move_to_end(query)
+                return self._queries[query]
+
+        rows = pa.array(np.arange(self.table.num_rows, dtype=np.int64))
+        if filter_text:
+            # Case-insensitive substring match (no regex) in any text column
+            mask = None
+            for col in self._text_columns:
+                match = pc.fill_null(pc.match_substring(self.table.column(col), filter_text, ignore_case=True), False)
+                mask = match if mask is None else pc.or_(mask, match)
+            rows = rows.filter(mask) if mask is not None else rows.slice(0, 0)
+        if sort_by:
+            keys = self.table.column(sort_by).take(rows)
+            order = pc.array_sort_indices(keys, order='descending' if descending else 'ascending', null_placement='at_end')
+            rows = rows.take(order)
+
+        with self._lock:
+            self._queries[query] = rows
+            while len(self._queries) > QUERY_CACHE_ENTRIES:
+                self._queries.popitem(last=False)
+        return rows
+
+    def count(self, filter_text=''):
+        return len(self._rows(filter_text, None, False))
+
+    def pages(self, page_size, filter_text=''):
+        return max(1, math.ceil(self.count(filter_text) / page_size))
+
+    def page(self, number, page_size, filter_text='', sort_by=None, descending=False):
+        """
+        Returns page number (from 0) of the filtered, sorted rows as a DataFrame.
+        """
+        rows = self._rows(filter_text, sort_by, descending)
+        return self.table.take(rows.slice(number * page_size, page_size)).to_pandas()
+
+    def totals(self, filter_text=''):
+        """
+        Returns {column: sum} over the rows matching filter_text.
+        """
+        rows = self._rows(filter_text, None, False)
+        return {
+            col: pc.sum(self.table.column(col).take(rows)).as_py() or 0.0
+            for col in self.sum_columns
+        }
@@ -0,0 +1,146 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from sections import SECTION_KEY, first_section_rows
+
+
+# Scenario parameters; a missing column means "as loaded" for every scenario
+BASE_RATE_COLUMN = 'Base Rate'
+ENROLLMENT_SCALE_COLUMN = 'Enrollment Scale'
+CAPACITY_SCALE_COLUMN = 'Capacity Scale'
+
+# Tier overrides are one column per course prefix, e.g. "Tier ACA"; NaN keeps the loaded tier
+TIER_COLUMN_PREFIX = 'Tier '
+
+# Upper bound on scenario x row cells evaluated at once (8 bytes each, a few live arrays)
+SCENARIO_BLOCK_CELLS = 2_000_000
+
+GROUPINGS = ('division', 'course', 'prefix')
+
+
+def tier_column(prefix):
+    return f"{TIER_COLUMN_PREFIX}{prefix.strip().upper()}"
+
+
+def scenario_grid(base_rates, enrollment_scales=(1.0,), capacity_scales=(1.0,), tier_overrides=None):
+    """
+    Returns the cartesian product of the given parameter values as a scenario
+    frame. tier_overrides maps a label to {prefix: tier value}; an empty dict
+    (or None) keeps the loaded tiers.
+    """
+    tier_overrides = tier_overrides or {'': {}}
+    rows = []
+    for base_rate, enrollment_scale, capacity_scale, (label, overrides) in itertools.product(
+        base_rates, enrollment_scales, capacity_scales, tier_overrides.items()
+    ):
+        name = f"base {base_rate:g}, enrollment x{enrollment_scale:g}, seats x{capacity_scale:g}"
+        row = {
+            'Scenario': f"{name}, {label}" if label else name,
+            BASE_RATE_COLUMN: base_rate,
+            ENROLLMENT_SCALE_COLUMN: enrollment_scale,
+            CAPACITY_SCALE_COLUMN: capacity_scale,
+        }
+        row.update({tier_column(prefix): value for prefix, value in overrides.items()})
+        rows.append(row)
+    return pd.DataFrame(rows).set_index('Scenario')
+
+
+class ScenarioEngine:
+    """
+    Evaluates what-if funding scenarios against a loaded CSAR frame. Each
+    scenario's Generated FTE is recomputed for every section row as one
+    scenario x row matrix, then summed per division, course or prefix.
+
+    Enrollment Scale multiplies FTE Count, capped at Capacity x Capacity Scale
+    (sections already over capacity count their enrollment as their seats, and
+    sections without a capacity are uncapped). Rounding follows
+    compute_fte_metrics, so the as-loaded scenario reproduces the report totals.
+    """
+
+    def __init__(self, df, group_keys, weeks, divisor, base_rate):
+        self.weeks = weeks
+        self.divisor = divisor
+        self.base_rate = base_rate
+
+        self.contact_hours = df['Contact Hours'].to_numpy(dtype=float)
+        self.fte_count = df['FTE Count'].to_numpy(dtype=float)
+        capacity = df['Capacity'].to_numpy(dtype=float)
+        self.seats = np.where(capacity > 0, np.maximum(capacity, self.fte_count), np.inf)
+        self.tier_value = df['Tier Value'].to_numpy(dtype=float)
+
+        # Course/prefix reports count each section once; division reports sum every row
+        first_row = first_section_rows(df[SECTION_KEY])
+        self.prefix_keys = group_keys['prefix']
+        self._groups = {}
+        for by, keys in group_keys.items():
+            rows = np.flatnonzero(keys.codes >= 0)
+            if by != 'division':
+                rows = rows[first_row[rows]]
+            order = rows[np.argsort(keys.codes[rows], kind='stable')]
+            codes = keys.codes[order]
+            starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=np.intp)
+            self._groups[by] = (order, starts, keys.categories[codes[starts]])
+
+    def _parameters(self, scenarios):
+        count = len(scenarios)
+
+        def column(name, default):
+            if name not in scenarios:
+                return np.full(count, default, dtype=float)
+            return scenarios[name].fillna(default).to_numpy(dtype=float)
+
+        base_rate = column(BASE_RATE_COLUMN, self.base_rate)
+        enrollment_scale = column(ENROLLMENT_SCALE_COLUMN, 1.0)
+        capacity_scale = column(CAPACITY_SCALE_COLUMN, 1.0)
+
+        overrides = []
+        for name in scenarios.columns:
+            if not name.startswith(TIER_COLUMN_PREFIX):
+                continue
+            prefix = name[len(TIER_COLUMN_PREFIX):].strip().upper()
+            code = self.prefix_keys.categories.get_indexer([prefix])[0]
+            if code >= 0:
+                overrides.append((code, scenarios[name].to_numpy(dtype=float)))
+        return base_rate, enrollment_scale, capacity_scale, overrides
+
+    def evaluate(self, scenarios, by='division'):
+        """
+        Returns total Generated FTE with one row per scenario and one column per
+        group (division codes are lower case, like the lookup index).
+        """
+        if by not in GROUPINGS:
+            raise ValueError(f"Unsupported grouping: {by}")
+        order, starts, labels = self._groups[by]
+        base_rate, enrollment_scale, capacity_scale, overrides = self._parameters(scenarios)
+
+        contact_hours = self.contact_hours[order]
+        fte_count = self.fte_count[order]
+        seats = self.seats[order]
+        tier_value = self.tier_value[order]
+        prefix_codes = self.prefix_keys.codes[order]
+        contact_weeks = contact_hours * self.weeks
+
+        totals = np.zeros((len(scenarios), len(labels)))
+        block = max(1, SCENARIO_BLOCK_CELLS // max(1, len(order)))
+        for start in range(0, len(scenarios) if len(order) else 0, block):
+            stop = min(start + block, len(scenarios))
+
+            # Scenario parameters as (block, 1) columns broadcast against (rows,);
+            # fmin leaves uncapped sections (inf seats) alone even at a zero seat scale
+            enrolled = np.fmin(fte_count * enrollment_scale[start:stop, None], seats * capacity_scale[start:stop, None])
+            calculated = np.round(contact_weeks * enrolled / self.divisor, 3)
+
+            tier = tier_value
+            if overrides:
+                tier = np.broadcast_to(tier_value, calculated.shape).copy()
+            for code, values in overrides:
+                rows = prefix_codes == code
+                values = values[start:stop, None]
+                tier[:, rows] = np.where(np.isnan(values), tier[:, rows], values)
+
+            generated = np.round((tier + base_rate[start:stop, None]) * calculated, 2)
+            totals[start:stop] = np.add.reduceat(generated, starts, axis=1)
+
+        return pd.DataFrame(totals.round(2), index=scenarios.index, columns=pd.Index(labels, name=by))
@@ -0,0 +1,14 @@
+# A section is one Sec Name within one term: Sec Names are reused from term to term
+SECTION_KEY = ['Term', 'Sec Name']
+
+
+def first_section_rows(sections):
+    """
+    Returns a boolean mask of each section's first row, given the SECTION_KEY
+    columns of a frame (df[SECTION_KEY]).
+
+    A section has one row per meeting pattern. Its first row carries the
+    division and the instructor list and is the row the course and instructor
+    reports keep, so per-section measures are read from it.
+    """
+    return ~sections.duplicated().to_numpy()
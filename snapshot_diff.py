@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+from sections import SECTION_KEY, first_section_rows
+
+
+# Section attributes carried into the diff (taken from the newer snapshot when present)
+SECTION_COLUMNS = ['Sec Divisions', 'Course Code', 'Sec Faculty Info']
+
+# Compared per section; each gets Old, New and Change columns
+MEASURE_COLUMNS = ['Capacity', 'FTE Count', 'Generated FTE']
+
+STATUSES = ['Added', 'Cancelled', 'Changed', 'Unchanged']
+
+# Rollup keys for the diff: report name -> section column
+ROLLUPS = {'division': 'Sec Divisions', 'course': 'Course Code', 'instructor': 'Sec Faculty Info'}
+
+
+def _keyed(df):
+    # One row per section, indexed on the normalized (Term, Sec Name)
+    keys = pd.DataFrame({col: df[col].astype('string').str.strip().str.upper() for col in SECTION_KEY})
+    first = first_section_rows(keys)
+    keyed = df.loc[first, SECTION_COLUMNS + MEASURE_COLUMNS].astype({col: 'string' for col in SECTION_COLUMNS})
+    keyed.index = pd.MultiIndex.from_frame(keys[first])
+    return keyed
+
+
+def diff_snapshots(old_df, new_df):
+    """
+    Returns one row per section found in either snapshot with its status
+    (Added, Cancelled, Changed or Unchanged) and the old, new and change values
+    of Capacity, FTE Count and Generated FTE.
+
+    Both frames are reduced to one row per normalized (Term, Sec Name) and
+    aligned with a single hash join on that index.
+    """
+    old = _keyed(old_df)
+    new = _keyed(new_df)
+    joined = old.join(new, how='outer', lsuffix=' Old', rsuffix=' New')
+
+    in_old = joined.index.isin(old.index)
+    in_new = joined.index.isin(new.index)
+
+    diff = pd.DataFrame(index=joined.index)
+    for col in SECTION_COLUMNS:
+        diff[col] = joined[f"{col} New"].where(in_new, joined[f"{col} Old"])
+
+    changed = np.zeros(len(joined), dtype=bool)
+    for col in MEASURE_COLUMNS:
+        old_values = joined[f"{col} Old"].astype(float).fillna(0)
+        new_values = joined[f"{col} New"].astype(float).fillna(0)
+        diff[f"{col} Old"] = old_values
+        diff[f"{col} New"] = new_values
+        diff[f"{col} Change"] = (new_values - old_values).round(2)
+        changed |= (diff[f"{col} Change"] != 0).to_numpy()
+
+    status = np.select(
+        [in_new & ~in_old, in_old & ~in_new, changed],
+        ['Added', 'Cancelled', 'Changed'],
+        default='Unchanged',
+    )
+    diff.insert(0, 'Status', pd.Categorical(status, categories=STATUSES))
+    return diff.sort_index().reset_index()
+
+
+def rollup_diff(diff, by='division'):
+    """
+    Sums a section diff per division, course or instructor: sections added,
+    cancelled and changed, plus the old, new and change totals.
+    """
+    key = ROLLUPS[by]
+    keys = diff[key].fillna('').astype(str).str.strip()
+    if by == 'division':
+        keys = keys.str.upper()
+
+    counts = pd.crosstab(keys, diff['Status']).reindex(columns=STATUSES[:3], fill_value=0)
+    totals = diff.groupby(keys)[[
+        f"{col} {part}" for col in MEASURE_COLUMNS for part in ('Old', 'New', 'Change')
+    ]].sum().round(2)
+
+    result = counts.join(totals)
+    result.index.name = key
+    result = result[result.index != '']
+    return result.sort_values('Generated FTE Change', key=abs, ascending=False).reset_index()
+
+
+def diff_series(snapshots):
+    """
+    Diffs consecutive snapshots. snapshots is an ordered {label: frame} mapping
+    (e.g. a week of daily files); returns the stacked section diffs with
+    'From' and 'To' columns, leaving out unchanged sections.
+    """
+    labels = list(snapshots)
+    diffs = []
+    for before, after in zip(labels, labels[1:]):
+        diff = diff_snapshots(snapshots[before], snapshots[after])
+        diff = diff[diff['Status'] != 'Unchanged']
+        diff.insert(0, 'To', after)
+        diff.insert(0, 'From', before)
+        diffs.append(diff)
+
+    if not diffs:
+        return pd.DataFrame(columns=['From', 'To', 'Status'] + SECTION_KEY)
+    return pd.concat(diffs, ignore_index=True)
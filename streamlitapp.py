@@ -1,75 +1,501 @@
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import re
-import io
-import matplotlib.pyplot as plt
-import tempfile
+import numpy as np
+import hashlib
+import importlib
+import math
+from concurrent.futures import wait
+from collections import defaultdict
+import threading
 import os
-from openpyxl.drawing.image import Image as XLImage
-from openpyxl.drawing.image import Image as ExcelImage
-from openpyxl import load_workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-from tempfile import NamedTemporaryFile
 from io import BytesIO
+from artifact_cache import cached_artifact
+from chunked_ingest import CSV_CHUNK_ROWS, IngestProgress, concat_chunks
+from instructor_search import InstructorSearch
+import background
+import instrumentation
+from instrumentation import count_lookup, count_miss, stage
+from meeting_times import RoomSchedule
+from report_viewer import PAGE_SIZES, ReportView
+from query_api import API_HOST, API_PORT, API_PORT_ENV, QueryAPI
+from olap_cube import CUBE_DIMENSIONS, CUBE_MEASURES, DRILL_PATHS, OlapCube
+from faculty_workload import WEIGHTINGS, FacultyWorkload
+from capacity_planning import ADD_SECTION_FILL, MERGE_RETENTION, UNDERFILLED_FILL, plan_capacity
+from snapshot_diff import ROLLUPS, diff_series, diff_snapshots, rollup_diff
+from scenarios import BASE_RATE_COLUMN, CAPACITY_SCALE_COLUMN, ENROLLMENT_SCALE_COLUMN, GROUPINGS, ScenarioEngine, scenario_grid, tier_column
+from history_store import HISTORY_DIR, ingest_snapshot, list_snapshots, read_history
+from reference_tables import CONTACT_HOURS_FILE, TIERS_FILE, load_contact_hours, load_tier_values
+
+
+# Columns that are numeric in the CSAR layout (coerced once, at load time)
+NUMERIC_COLUMNS = ['Capacity', 'FTE Count', 'Total FTE', 'Tier Value', 'Contact Hours']
+
+# Other numeric columns of the export, converted when present
+EXTRA_NUMERIC_COLUMNS = ['1926', 'Total Tier']
+
+# Whole-number columns, stored as int32 when every value is integral
+INTEGER_COLUMNS = ['Capacity', 'FTE Count', 'Tier Value', '1926', 'Total Tier']
+
+# Low-cardinality text, stored as categoricals (small integer codes plus one
+# copy of each distinct value)
+CATEGORICAL_COLUMNS = [
+    'Term', 'X Sec Delivery Method', 'Meeting Times', 'Sec Faculty Info',
+    'Sec All Faculty Last Names', 'Sec Divisions', 'Course Code', 'Course Prefix',
+]
+
+# Y/N columns, stored as bool
+FLAG_COLUMNS = ['Sec Allow Waitlist Flag']
+
+# FTE formula: Calculated FTE = Contact Hours * WEEKS_PER_TERM * FTE Count / FTE_HOURS_DIVISOR
+WEEKS_PER_TERM = 16
+FTE_HOURS_DIVISOR = 512
+
+# Generated FTE = (Tier Value + BASE_FUNDING_RATE) * Calculated FTE
+BASE_FUNDING_RATE = 1926
+
+# Rows converted per batch while streaming a sheet into a write-only workbook
+EXCEL_CHUNK_ROWS = 5000
+
+# Download formats: xlsx keeps every sheet, csv/parquet export the report table only
+EXPORT_MIME_TYPES = {
+    'xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    'csv': "text/csv",
+    'parquet': "application/vnd.apache.parquet",
+}
+
+# How many rendered Top 10 chart PNGs stay cached (least recently used are evicted first)
+CHART_CACHE_ENTRIES = 256
+
+# How many distinct uploads (or reference table versions) stay memoized
+DATASET_CACHE_ENTRIES = 8
+
+# Indexes, engines and report views built per dataset version share one memo
+# (least recently used are evicted first): room for the six per-dataset
+# resources of every cached upload, plus the report views
+VERSIONED_RESOURCE_ENTRIES = DATASET_CACHE_ENTRIES * 6 + CHART_CACHE_ENTRIES
+
+# How often the page redraws the progress of an upload being parsed
+LOAD_POLL_SECONDS = 0.25
+
+# Set to 1 (or open the app with ?debug=1) to show the performance panel in the sidebar
+DEBUG_PANEL_ENV = "CSAR_DEBUG"
+
+# Plotting and Excel modules are imported where charts and workbooks are built,
+# not at startup; these are warmed up on a background thread after the first page
+DEFERRED_IMPORTS = ['matplotlib.figure', 'matplotlib.backends.backend_agg', 'openpyxl', 'openpyxl.drawing.image']
+
+
+def compact_types(df):
+    """
+    Converts a CSAR frame to the compact schema in place: int32 whole-number
+    columns, categorical low-cardinality text and bool flags.
+    """
+    for col in INTEGER_COLUMNS:
+        if col in df.columns and pd.api.types.is_float_dtype(df[col]):
+            values = df[col].to_numpy()
+            if np.isfinite(values).all() and (values == np.round(values)).all() and np.abs(values).max(initial=0) < 2**31:
+                df[col] = values.astype(np.int32)
+        elif col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype(np.int32)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    # Stored snapshots may carry the flag as text ("Y" from the CSAR, "True" from a typed frame)
+    for col in FLAG_COLUMNS:
+        if col in df.columns and not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].astype('string').str.strip().str.upper().isin(['Y', 'TRUE']).to_numpy()
 
+    return df
 
-def read_spreadsheets(uploaded_file):
-    # Read main uploaded file (user-uploaded current year data)
-    df = pd.read_csv(uploaded_file, dtype=str)
 
+def _enrich_chunk(df, contact_hours, tier_values):
     # Clean main dataframe
     df['Sec Name'] = df['Sec Name'].str.strip().str.upper()
-    df['Course Code'] = df['Sec Name'].apply(lambda x: '-'.join(x.split('-')[:-1]))
-    df['Course Prefix'] = df['Course Code'].apply(lambda x: x.split('-')[0].strip())
+    df['Course Code'] = df['Sec Name'].str.rpartition('-')[0]
+    df['Course Prefix'] = df['Course Code'].str.partition('-')[0].str.strip()
+
+    # Convert numeric fields once so no report has to coerce them again
+    with stage("load.coerce_numeric", rows=len(df)):
+        for col in NUMERIC_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+            else:
+                df[col] = np.nan
+        for col in EXTRA_NUMERIC_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    # Values carried by the CSAR itself win; the reference tables fill the gaps
+    with stage("load.enrich", rows=len(df)):
+        df['Contact Hours'] = df['Contact Hours'].fillna(df['Course Code'].map(contact_hours)).fillna(0)
+        df['Tier Value'] = df['Tier Value'].fillna(df['Course Prefix'].map(tier_values)).fillna(0)
+        df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].fillna(0)
+
+    with stage("load.compact_types", rows=len(df)):
+        return compact_types(df)
+
+
+def iter_csar_chunks(source, chunk_rows=CSV_CHUNK_ROWS):
+    """
+    Yields a CSAR csv (path or file object) as enriched, typed chunks of up to
+    chunk_rows rows, each with the fraction of the file parsed so far.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield from iter_csar_chunks(file, chunk_rows)
+        return
+
+    start = source.tell()
+    size = source.seek(0, os.SEEK_END) - start
+    source.seek(start)
+
+    # Hardcoded contact hours (keyed by course code) and tiers (keyed by prefix),
+    # read from their compiled Parquet copies
+    with stage("load.reference_tables"):
+        contact_hours = load_contact_hours()
+        tier_values = load_tier_values()
+
+    # Low-cardinality columns are parsed straight into categoricals
+    dtypes = defaultdict(lambda: str, {col: 'category' for col in CATEGORICAL_COLUMNS})
+    reader = pd.read_csv(source, dtype=dtypes, chunksize=chunk_rows)
+    while True:
+        with stage("load.read_csv"):
+            chunk = next(reader, None)
+        if chunk is None:
+            break
+        if chunk.empty:
+            # A header-only file reads as one empty chunk
+            continue
+        fraction = min(1.0, (source.tell() - start) / size) if size else 1.0
+        yield _enrich_chunk(chunk, contact_hours, tier_values), fraction
+
+
+def read_spreadsheets(uploaded_file, chunk_rows=CSV_CHUNK_ROWS):
+    # Read main uploaded file (user-uploaded current year data) a chunk at a time,
+    # so only one chunk is ever held as raw text
+    return concat_chunks([chunk for chunk, _ in iter_csar_chunks(uploaded_file, chunk_rows)])
+
+
+# Columns added by compute_fte_metrics (derived, so never persisted)
+FTE_METRIC_COLUMNS = ['Calculated FTE', 'Generated FTE', 'Enrollment Per', 'Enrollment Percentage']
+
+# Columns shown blank (rather than missing) on an exported report's Total row
+TOTAL_ROW_BLANK_COLUMNS = [
+    'Sec Divisions', 'Course Code', 'X Sec Delivery Method', 'Meeting Times', 'Capacity',
+    'FTE Count', 'Contact Hours', 'Tier Value', 'Calculated FTE', 'Enrollment Per',
+]
+
+
+def compute_fte_metrics(df, weeks=WEEKS_PER_TERM, divisor=FTE_HOURS_DIVISOR, base_rate=BASE_FUNDING_RATE):
+    """
+    Adds Calculated FTE, Generated FTE, Enrollment Per and Enrollment Percentage
+    to the whole frame in one vectorized pass. Every report slices from these.
+    """
+    with stage("load.fte_metrics", rows=len(df)):
+        contact_hours = df['Contact Hours'].to_numpy(dtype=float)
+        fte_count = df['FTE Count'].to_numpy(dtype=float)
+        capacity = df['Capacity'].to_numpy(dtype=float)
+        tier_value = df['Tier Value'].to_numpy(dtype=float)
+
+        calculated_fte = np.round(contact_hours * weeks * fte_count / divisor, 3)
+        generated_fte = np.round((tier_value + base_rate) * calculated_fte, 2)
+
+        # Sections without a capacity count as 0% full
+        with np.errstate(divide='ignore', invalid='ignore'):
+            enrollment = np.where(capacity != 0, fte_count / capacity, 0.0)
+
+        # Only a few hundred distinct percentages exist, so each label is formatted once
+        percentages, codes = np.unique(np.round(enrollment * 100, 2), return_inverse=True)
+        labels = list(pd.Index(percentages).astype(str) + '%') + ['0%']
+        codes[capacity == 0] = len(percentages)
+        enrollment_pct = pd.Categorical.from_codes(codes, categories=labels)
+
+        df['Calculated FTE'] = calculated_fte
+        df['Generated FTE'] = generated_fte
+        df['Enrollment Per'] = np.round(enrollment, 4)
+        df['Enrollment Percentage'] = enrollment_pct
+    return df
+
 
-    # Read hardcoded contact hours
-    contact_df = pd.read_excel("contact_hours.xlsx", dtype=str)
-    contact_df['Sec Name'] = contact_df['Sec Name'].str.strip().str.upper()
-    contact_df['FTE Count'] = pd.to_numeric(contact_df['FTE Count'], errors='coerce').fillna(0)
-    contact_df['Contact Hours'] = pd.to_numeric(contact_df['Contact Hours'], errors='coerce').fillna(0)
+def stream_csar(source, progress=None, chunk_rows=CSV_CHUNK_ROWS, keep_rows=True):
+    """
+    Loads a CSAR csv chunk by chunk: each chunk is enriched, typed, gets its FTE
+    metrics and is folded into running division/course/instructor totals.
 
-    # Merge contact hours into main df
-    df = df.merge(contact_df[['Sec Name', 'FTE Count', 'Contact Hours']], on='Sec Name', how='left')
+    progress (an IngestProgress) is updated after every chunk. With keep_rows
+    off only the totals are kept, so memory is bounded by the chunk size; the
+    frame (or None) and the totals are returned.
+    """
+    progress = progress or IngestProgress()
+    chunks = []
+    for chunk, fraction in iter_csar_chunks(source, chunk_rows):
+        chunk = compute_fte_metrics(chunk)
+        progress.totals.add(chunk)
+        progress.fraction = fraction
+        if keep_rows:
+            chunks.append(chunk)
+
+    df = concat_chunks(chunks) if chunks else None
+    return df, progress.totals
+
+
+def _file_mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+
+@st.cache_resource(max_entries=DATASET_CACHE_ENTRIES, show_spinner=False)
+def _load_dataset_cached(dataset_version, _raw_bytes, _progress=None):
+    count_miss("dataset")
+    df, _ = stream_csar(BytesIO(_raw_bytes), _progress)
+    if df is None:
+        raise pd.errors.EmptyDataError("No data rows to load")
+    df.attrs['dataset_version'] = dataset_version
+    return df
 
-    # Read hardcoded tiers spreadsheet
-    tiers_df = pd.read_excel("tiers.xlsx", dtype=str)
-    tiers_df['Prefix/Course ID'] = tiers_df['Prefix/Course ID'].str.strip().str.upper()
-    tiers_df['New Sector'] = pd.to_numeric(tiers_df['New Sector'], errors='coerce').fillna(0)
 
-    # Merge Tier Value into df based on Course Prefix
-    df = df.merge(tiers_df[['Prefix/Course ID', 'New Sector']], 
-                  left_on='Course Prefix', 
-                  right_on='Prefix/Course ID', 
-                  how='left')
+def _dataset_key(uploaded_file):
+    # Returns (dataset version, raw bytes) for an upload or a path on disk
+    if isinstance(uploaded_file, (str, os.PathLike)):
+        with open(uploaded_file, "rb") as file:
+            raw_bytes = file.read()
+    else:
+        raw_bytes = uploaded_file.getvalue()
+
+    # The content hash of an upload is taken once per session, not on every rerun
+    # (only the current upload's hash is kept, so session state stays small)
+    file_id = getattr(uploaded_file, 'file_id', None)
+    content_hash = st.session_state.get('upload_hash', {}).get(file_id) if file_id else None
+    if content_hash is None:
+        content_hash = hashlib.sha256(raw_bytes).hexdigest()
+        if file_id:
+            st.session_state['upload_hash'] = {file_id: content_hash}
 
-    # Rename for clarity in the rest of your calculations
-    df.rename(columns={'New Sector': 'Tier Value'}, inplace=True)
+    key = hashlib.sha256(content_hash.encode())
+    for path in (CONTACT_HOURS_FILE, TIERS_FILE):
+        key.update(f"{path}:{_file_mtime(path)}".encode())
+    return key.hexdigest()[:16], raw_bytes
 
+
+def load_dataset(uploaded_file, progress=None):
+    """
+    Returns the enriched, typed CSAR frame for an upload (or a path on disk).
+
+    The result is memoized across reruns and sessions, keyed on a hash of the
+    upload content plus the mtimes of the reference spreadsheets. The frame is
+    shared between callers, so reports must treat it as read-only.
+    """
+    version, raw_bytes = _dataset_key(uploaded_file)
+    count_lookup("dataset")
+    return _load_dataset_cached(version, raw_bytes, progress)
+
+
+def load_upload_with_progress(uploaded_file):
+    """
+    Loads an upload on the loader thread while the page shows how much of the
+    file is parsed and the division totals so far. A cached upload returns
+    before anything is drawn.
+    """
+    version, raw_bytes = _dataset_key(uploaded_file)
+    count_lookup("dataset")
+    progress = IngestProgress()
+    future = background.load_executor.submit(_load_dataset_cached, version, raw_bytes, progress)
+
+    bar = live_totals = None
+    while not wait([future], timeout=LOAD_POLL_SECONDS).done:
+        if bar is None:
+            bar = st.progress(0.0)
+            live_totals = st.empty()
+        bar.progress(progress.fraction, text=f"Loading... {progress.totals.rows:,} rows, {progress.totals.sections:,} sections")
+        live_totals.dataframe(progress.totals.table('division'))
+
+    if bar is not None:
+        bar.empty()
+        live_totals.empty()
+    return future.result()
+
+
+@st.cache_resource(max_entries=DATASET_CACHE_ENTRIES, show_spinner=False)
+def _load_history_cached(dataset_version, root, term, snapshot_date):
+    count_miss("history_dataset")
+    with stage("load.read_history", term=term, snapshot=snapshot_date):
+        df = compact_types(read_history(root, terms=[term], snapshots=[snapshot_date]))
+    df = compute_fte_metrics(df)
+    df.attrs['dataset_version'] = dataset_version
     return df
 
 
-# Function to handle Sec Division Report
-def sec_divisions(df, user_input):
-    column_to_filter = 'Sec Divisions'
+def load_history_dataset(term, snapshot_date, root=HISTORY_DIR):
+    """
+    Returns one stored snapshot from the history store, enriched like an upload.
+    """
+    count_lookup("history_dataset")
+    return _load_history_cached(_history_version(root, term, snapshot_date), root, term, snapshot_date)
+
+
+def _history_version(root, term, snapshot_date):
+    # Appending to a partition changes its mtime, and so the version
+    partition_dir = os.path.join(root, f"term={term}", f"snapshot={snapshot_date}")
+    key = hashlib.sha256(f"history:{term}:{snapshot_date}:{_file_mtime(partition_dir)}".encode())
+    return key.hexdigest()[:16]
 
-    unique_divisions = df[column_to_filter].dropna().str.lower().unique()
+
+def dataset_version(df):
+    return df.attrs.get('dataset_version', '')
+
+
+def _normalized_keys(column, normalize):
+    # Categorical columns are normalized per distinct value, then mapped back by code
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        keys = pd.Categorical(normalize(pd.Series(column.cat.categories, dtype='string')))
+        codes = column.cat.codes.to_numpy()
+        keys_codes = np.where(codes >= 0, keys.codes[codes] if len(keys.codes) else -1, -1)
+        return pd.Categorical.from_codes(keys_codes, categories=keys.categories).remove_unused_categories()
+    return pd.Categorical(normalize(column))
+
+
+def _group_positions(keys):
+    # One stable sort over the category codes, then split into per-key row positions
+    codes = keys.codes
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(keys.categories))
+    starts = np.searchsorted(codes[order], 0)
+    groups = np.split(order[starts:], np.cumsum(counts)[:-1])
+    return dict(zip(keys.categories, groups))
+
+
+class LookupIndex:
+    """
+    Normalized key columns and row positions for every division, course code
+    and course prefix, so a report slice costs O(group size).
+    """
+
+    def __init__(self, df):
+        self.division_keys = _normalized_keys(df['Sec Divisions'], lambda keys: keys.str.strip().str.lower())
+        self.course_keys = _normalized_keys(df['Course Code'], lambda keys: keys.str.strip().str.upper())
+        self.prefix_keys = _normalized_keys(df['Course Prefix'], lambda keys: keys.str.strip().str.upper())
+
+        self.divisions = _group_positions(self.division_keys)
+        self.courses = _group_positions(self.course_keys)
+        self.prefixes = _group_positions(self.prefix_keys)
+
+    def division_rows(self, division_code):
+        return self.divisions.get(division_code.strip().lower(), np.array([], dtype=np.intp))
+
+    def course_rows(self, course_code):
+        return self.courses.get(course_code.strip().upper(), np.array([], dtype=np.intp))
+
+    def prefix_rows(self, prefix):
+        return self.prefixes.get(prefix.strip().upper(), np.array([], dtype=np.intp))
+
+
+@st.cache_resource(max_entries=VERSIONED_RESOURCE_ENTRIES, show_spinner=False)
+def _versioned_resource_cached(name, key, version, _build, _source):
+    count_miss(name)
+    with stage(f"index.{name}", rows=len(_source)):
+        return _build(_source)
+
+
+def versioned_resource(df, name, build, source=None, key=None):
+    """
+    Returns build(source) (source defaults to df), memoized per resource name,
+    key and dataset version and shared by every session. Frames without a
+    version are built directly.
+    """
+    source = df if source is None else source
+    version = dataset_version(df)
+    if not version:
+        with stage(f"index.{name}", rows=len(source)):
+            return build(source)
+    count_lookup(name)
+    return _versioned_resource_cached(name, key, version, build, source)
+
+
+def get_lookup_index(df):
+    # Slices inherit attrs from the loaded frame, so the row count guards against
+    # reusing positions built for a different frame
+    index = versioned_resource(df, "lookup_index", LookupIndex)
+    if len(index.division_keys) == len(df):
+        return index
+    count_miss("lookup_index")
+    with stage("index.lookup_index", rows=len(df)):
+        return LookupIndex(df)
+
+
+def get_instructor_search(df):
+    return versioned_resource(df, "instructor_search", InstructorSearch)
+
+
+def get_faculty_workload(df):
+    return versioned_resource(df, "faculty_workload", FacultyWorkload)
+
+
+def get_olap_cube(df):
+    return versioned_resource(df, "olap_cube", OlapCube)
+
+
+@st.cache_resource(show_spinner=False)
+def _history_cube_cached(root):
+    count_miss("history_cube")
+    return OlapCube()
+
+
+def get_history_cube(root=HISTORY_DIR):
+    """
+    Returns the cube over the latest saved snapshot of every term. Terms with a
+    newer (or appended) snapshot than the cube holds are swapped in with
+    OlapCube.update rather than rebuilding the cube.
+    """
+    count_lookup("history_cube")
+    cube = _history_cube_cached(root)
+    latest = list_snapshots(root).drop_duplicates('Term')
+    for term, snapshot_date in zip(latest['Term'], latest['Snapshot Date']):
+        version = _history_version(root, term, snapshot_date)
+        if cube.snapshots.get(term) != version:
+            with stage("olap.update", term=term, snapshot=snapshot_date):
+                cube.update(load_history_dataset(term, snapshot_date, root), label=version)
+    return cube
+
+
+def get_room_schedule(df):
+    return versioned_resource(df, "room_schedule", RoomSchedule)
+
+
+def _build_scenario_engine(df):
+    index = get_lookup_index(df)
+    group_keys = {'division': index.division_keys, 'course': index.course_keys, 'prefix': index.prefix_keys}
+    return ScenarioEngine(df, group_keys, WEEKS_PER_TERM, FTE_HOURS_DIVISOR, BASE_FUNDING_RATE)
+
+
+def get_scenario_engine(df):
+    return versioned_resource(df, "scenario_engine", _build_scenario_engine)
+
+
+# Function to handle Sec Division Report
+def sec_divisions(df, user_input, export_format='xlsx'):
+    index = get_lookup_index(df)
+    unique_divisions = list(index.divisions)
 
     if user_input.strip().lower() == "all":
         selected_divisions = unique_divisions  # Use all divisions
     else:
         selected_divisions = [code.strip().lower() for code in user_input.split(",")]
-        selected_divisions = [code for code in selected_divisions if code in unique_divisions]
+        selected_divisions = [code for code in selected_divisions if code in index.divisions]
 
         if not selected_divisions:
             return None, "No valid divisions entered. Please check your input."
 
+    # Files are returned as (name, bytes) rather than written to the working
+    # directory, which every session of the server shares
     output_files = []
     for division in selected_divisions:
-        division_df = df[df[column_to_filter].str.strip().str.lower() == division]
-        output_file = f"{division}.xlsx"
-        division_df.to_excel(output_file, index=False)
-        output_files.append(output_file)
+        division_df = df.iloc[index.divisions[division]]
+        data = cached_artifact(
+            'sec_division', division, dataset_version(df), export_format,
+            lambda: export_report(division_df, export_format, sheet_name='Sheet1'),
+        )
+        output_files.append((f"{division}.{export_format}", data))
 
     return output_files, None
 
@@ -78,22 +504,12 @@ def course_enrollment_percentage(course_code, df):
     """
     Returns filtered and processed DataFrame for a given course_code.
     """
-    filtered_df = df[df['Sec Name'].str.contains(fr'^{re.escape(course_code)}-\d+', case=False, regex=True, na=False)]
+    filtered_df = df.iloc[get_lookup_index(df).course_rows(course_code)]
     if filtered_df.empty:
         return None
 
-    filtered_df['Capacity'] = pd.to_numeric(filtered_df['Capacity'], errors='coerce').fillna(0)
-    filtered_df['FTE Count'] = pd.to_numeric(filtered_df['FTE Count'], errors='coerce').fillna(0)
-    filtered_df['Contact Hours'] = pd.to_numeric(filtered_df['Contact Hours'], errors='coerce').fillna(0)
-
-    filtered_df = filtered_df.drop_duplicates(subset=['Sec Name'])
-
-    filtered_df['Enrollment Percentage'] = filtered_df.apply(
-        lambda row: f"{round((row['FTE Count'] / row['Capacity']) * 100, 2)}%" if row['Capacity'] != 0 else "0%", axis=1)
-
-    filtered_df['Calculated FTE'] = (
-        (filtered_df['Contact Hours'] * 16 * filtered_df['FTE Count']) / 512
-    ).fillna(0).round(2)
+    filtered_df = filtered_df.drop_duplicates(subset=['Sec Name']).copy()
+    filtered_df['Calculated FTE'] = filtered_df['Calculated FTE'].round(2)
 
     final_columns = [
         'Sec Divisions', 'Sec Name', 'X Sec Delivery Method', 'Meeting Times',
@@ -103,24 +519,30 @@ def course_enrollment_percentage(course_code, df):
     return filtered_df[final_columns]
 
 
-def generate_fte_by_division(df, division_code):
-    # Clean and filter
-    df['Course Code'] = df['Sec Name'].apply(lambda x: '-'.join(x.split('-')[:-1]))
-    df = df[df['Sec Divisions'].str.strip().str.lower() == division_code.strip().lower()].copy()
-    
-    if df.empty:
-        return None, None, None, None
+def report_totals(report_df):
+    # Totals are kept apart from the report rows and only appended on export
+    return {'Generated FTE': report_df['Generated FTE'].sum()}
 
-    # Convert numeric fields
-    df['FTE Count'] = pd.to_numeric(df['FTE Count'], errors='coerce').fillna(0)
-    df['Capacity'] = pd.to_numeric(df['Capacity'], errors='coerce').fillna(0)
-    df['Contact Hours'] = pd.to_numeric(df['Contact Hours'], errors='coerce').fillna(0)
-    df['Tier Value'] = pd.to_numeric(df['Tier Value'], errors='coerce').fillna(0)
 
-    # Calculations
-    df['Calculated FTE'] = ((df['Contact Hours'] * 16 * df['FTE Count']) / 512).round(3)
-    df['Generated FTE'] = ((df['Tier Value'] + 1926) * df['Calculated FTE']).round(2)
-    df['Enrollment Per'] = df.apply(lambda row: (row['FTE Count'] / row['Capacity']) if row['Capacity'] else 0, axis=1).round(4)
+def with_total_row(report_df):
+    """
+    Returns the FTE report rows with the Total row the exported files carry
+    (report columns other than the totals are left blank).
+    """
+    total_row = {col: '' for col in TOTAL_ROW_BLANK_COLUMNS if col in report_df.columns}
+    total_row.update({'Sec Name': 'Total', **report_totals(report_df)})
+    return pd.concat([report_df, pd.DataFrame([total_row])], ignore_index=True)
+
+
+def fte_by_division(df, division_code):
+    """
+    Returns the FTE report rows and the top 10 courses for a division.
+    """
+    # Filter (FTE metrics are already computed on the loaded frame)
+    df = df.iloc[get_lookup_index(df).division_rows(division_code)]
+    
+    if df.empty:
+        return None, None
 
     # Output DataFrame
     output_df = df[[
@@ -129,130 +551,283 @@ def generate_fte_by_division(df, division_code):
         'Calculated FTE', 'Enrollment Per', 'Generated FTE'
     ]].sort_values(by='Sec Name')
 
-     # Add total row for Generated FTE
-    total_generated_fte = output_df['Generated FTE'].sum()
-    total_row = {
-        'Sec Divisions': '',
-        'Course Code': '',
-        'Sec Name': 'Total',
-        'X Sec Delivery Method': '',
-        'Meeting Times': '',
-        'Capacity': '',
-        'FTE Count': '',
-        'Contact Hours': '',
-        'Calculated FTE': '',
-        'Enrollment Per': '',
-        'Generated FTE': total_generated_fte
-    }
-    output_df = pd.concat([output_df, pd.DataFrame([total_row])], ignore_index=True)
-
-    # Top 10 plot
-    top_10 = df.groupby('Course Code')['Generated FTE'].sum().nlargest(10).reset_index()
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.barh(top_10['Course Code'], top_10['Generated FTE'], color='skyblue')
-    ax.set_xlabel('Generated FTE')
-    ax.set_title('Top 10 Courses by Generated FTE')
-    ax.invert_yaxis()
-    plt.tight_layout()
-
-    return output_df, top_10, fig, division_code
-
-
-def fte_by_instructor():
+    # Top 10 courses
+    top_10 = df.groupby('Course Code', observed=True)['Generated FTE'].sum().nlargest(10).reset_index()
+
+    return output_df, top_10
+
+
+def division_chart_png(df, division_code, top_10):
+    return top_10_chart_png(
+        df, ('division', division_code.strip().lower()), top_10, 'Course Code',
+        'Top 10 Courses by Generated FTE', invert=True
+    )
+
+
+def generate_fte_by_division(df, division_code):
+    output_df, top_10 = fte_by_division(df, division_code)
+    if output_df is None:
+        return None, None, None, None
+
+    return output_df, top_10, division_chart_png(df, division_code, top_10), division_code
+
+
+def fte_per_instructor(df, instructor_name, fuzzy=False):
+    """
+    Returns the FTE report rows and the top 10 sections for an instructor
+    (with fuzzy, also for the names that look like misspellings of it).
+    """
+    faculty_df = df.iloc[get_instructor_search(df).rows(instructor_name, fuzzy=fuzzy)]
+    if faculty_df.empty:
+        return None, None
+
+    faculty_df = faculty_df.drop_duplicates(subset='Sec Name')
+    faculty_df = faculty_df.sort_values(by=['Course Code', 'Sec Name'])
+
+    # Top 10 sections
+    top_10_df = faculty_df.nlargest(10, 'Generated FTE')
+
+    return faculty_df, top_10_df
+
+
+def instructor_file_code(instructor_name):
+    # Set file-safe name
+    name_parts = instructor_name.split()
+    return f"{name_parts[-1].lower()}{name_parts[0][0].lower()}" if len(name_parts) >= 2 else "faculty_fte"
+
+
+def _draw_top_10_png(labels, values, title, color, invert):
+    # A standalone Figure (no pyplot state) is never registered globally, so it
+    # is freed as soon as the PNG is written and is safe to draw off the main thread
+    with stage("chart.render", title=title):
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(10, 6))
+        ax = fig.subplots()
+        ax.barh(labels, values, color=color)
+        ax.set_xlabel('Generated FTE')
+        ax.set_title(title)
+        if invert:
+            ax.invert_yaxis()
+            fig.tight_layout()
+        return figure_png(fig)
+
+
+@st.cache_data(max_entries=CHART_CACHE_ENTRIES, show_spinner=False)
+def _top_10_png_cached(chart_key, version, title, color, invert, _labels, _values):
+    count_miss("chart")
+    return _draw_top_10_png(_labels, _values, title, color, invert)
+
+
+def top_10_chart_png(df, chart_key, top_df, label_column, title, color='skyblue', invert=False):
+    """
+    Returns the Top 10 bar chart as PNG bytes, rendered once per (chart_key,
+    dataset version). The same bytes feed st.image and the Excel chart sheet.
+    """
+    labels = top_df[label_column].tolist()
+    values = top_df['Generated FTE'].tolist()
+    version = dataset_version(df)
+    if not version:
+        return _draw_top_10_png(labels, values, title, color, invert)
+    count_lookup("chart")
+    return _top_10_png_cached(chart_key, version, title, color, invert, labels, values)
+
+
+def _sheet_rows(df):
+    # Header, then the data converted a chunk at a time (blanks become empty cells)
+    yield list(df.columns)
+    for start in range(0, len(df), EXCEL_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXCEL_CHUNK_ROWS].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def write_report_workbook(output, sheets, chart_png=None, column_width=None):
+    """
+    Streams (sheet name, DataFrame) pairs into a write-only openpyxl workbook,
+    so memory does not grow with the row count. chart_png, if given, is placed
+    on an "FTE Chart" sheet.
+    """
+    from openpyxl import Workbook
+    from openpyxl.drawing.image import Image as ExcelImage
+    from openpyxl.utils import get_column_letter
+
+    workbook = Workbook(write_only=True)
+    for sheet_name, sheet_df in sheets:
+        sheet = workbook.create_sheet(sheet_name)
+        if column_width:
+            for col_idx in range(1, len(sheet_df.columns) + 1):
+                sheet.column_dimensions[get_column_letter(col_idx)].width = column_width
+        for row in _sheet_rows(sheet_df):
+            sheet.append(row)
+
+    if chart_png is not None:
+        chart_sheet = workbook.create_sheet("FTE Chart")
+        chart_sheet.add_image(ExcelImage(BytesIO(chart_png)), "B2")
+
+    workbook.save(output)
+
+
+def export_report(report_df, export_format='xlsx', top_10_df=None, chart_png=None, sheet_name='FTE Report', column_width=None):
+    """
+    Returns the report as xlsx, csv or parquet bytes. csv and parquet skip
+    openpyxl entirely and carry only the report table.
+    """
+    if export_format not in EXPORT_MIME_TYPES:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    output = BytesIO()
+    with stage(f"export.{export_format}", rows=len(report_df)):
+        if export_format == 'xlsx':
+            sheets = [(sheet_name, report_df)]
+            if top_10_df is not None:
+                sheets.append(('Top 10 FTE', top_10_df))
+            write_report_workbook(output, sheets, chart_png, column_width)
+        elif export_format == 'csv':
+            report_df.to_csv(output, index=False)
+        else:
+            # Total rows leave '' in numeric columns; store those as nulls
+            report_df.replace('', None).infer_objects().to_parquet(output, index=False)
+    return output.getvalue()
+
+
+def figure_png(fig):
+    tmp_image = BytesIO()
+    fig.savefig(tmp_image, format="png")
+    return tmp_image.getvalue()
+
+
+def fte_report_workbook(report_df, top_10_df, chart_png):
+    """
+    Builds the FTE report workbook (report with its total row, Top 10 and chart
+    sheets) and returns its bytes.
+    """
+    return export_report(with_total_row(report_df), 'xlsx', top_10_df, chart_png)
+
+
+def report_download_button(report_df, file_stem, top_10_df=None, chart_png=None, sheet_name='FTE Report', column_width=None, artifact=None, total_row=False):
+    """
+    Save Report button. artifact is (report type, entity, dataset version); when
+    given, the finished file comes from (or goes into) the on-disk artifact cache.
+    total_row appends the FTE report's Total row to the exported table.
+    """
+    # Format comes from the sidebar "Download format" selector
+    export_format = st.session_state.get('export_format', 'xlsx')
+
+    def build():
+        table = with_total_row(report_df) if total_row else report_df
+        return export_report(table, export_format, top_10_df, chart_png, sheet_name, column_width)
+
+    data = cached_artifact(*artifact, export_format, build) if artifact else build()
+    st.download_button(
+        label="Save Report",
+        data=data,
+        file_name=f"{file_stem}.{export_format}",
+        mime=EXPORT_MIME_TYPES[export_format],
+    )
+
+
+def get_report_view(df, report_key, report_df):
+    # One Arrow-backed view per (report, dataset version), shared by every session
+    return versioned_resource(df, "report_view", ReportView, source=report_df, key=report_key)
+
+
+def report_viewer(view, key):
+    """
+    Shows one page of a ReportView with filter, sort and paging controls, and
+    the totals of the filtered rows as metrics under it.
+    """
+    filter_col, sort_col, order_col, size_col = st.columns([3, 3, 2, 2])
+    filter_text = filter_col.text_input("Filter rows", key=f"{key}_filter").strip()
+    sort_by = sort_col.selectbox("Sort by", options=["Report order"] + view.columns, key=f"{key}_sort")
+    descending = order_col.checkbox("Descending", key=f"{key}_descending")
+    page_size = size_col.selectbox("Rows per page", options=PAGE_SIZES, key=f"{key}_size")
+    sort_by = None if sort_by == "Report order" else sort_by
+
+    matched = view.count(filter_text)
+    pages = max(1, math.ceil(matched / page_size))
+    # A new filter starts from the first page; a smaller page count clamps the page
+    page_key = f"{key}_page"
+    if st.session_state.get(f"{key}_paged_filter") != filter_text:
+        st.session_state[f"{key}_paged_filter"] = filter_text
+        st.session_state[page_key] = 1
+    st.session_state[page_key] = min(st.session_state.get(page_key, 1), pages)
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=page_key)
+
+    with stage("view.page", rows=matched, page_size=page_size):
+        page_df = view.page(page - 1, page_size, filter_text, sort_by, descending)
+    st.dataframe(page_df, hide_index=True)
+    first_row = (page - 1) * page_size
+    st.caption(f"Rows {first_row + 1 if matched else 0:,}-{first_row + len(page_df):,} of {matched:,}")
+
+    totals = view.totals(filter_text)
+    for column, (name, value) in zip(st.columns(max(1, len(totals))), totals.items()):
+        column.metric(f"Total {name}", f"{value:,.2f}")
+
+
+def shown_report(df, kind, entity, clicked):
+    """
+    Returns the entity whose report stays on screen for this report type. It is
+    set when Generate is clicked and kept through the reruns that the viewer's
+    controls cause, until another dataset is loaded.
+    """
+    key = f"shown_{kind}_report"
+    if clicked:
+        st.session_state[key] = (dataset_version(df), entity)
+    shown = st.session_state.get(key)
+    if shown and shown[0] == dataset_version(df):
+        return shown[1]
+    return None
+
+
+def fte_by_instructor(df):
     st.subheader("FTE per Instructor")
     st.write("Select or enter an instructor to generate an FTE report.")
 
-    input_file = "deanDailyCsar.csv"
     try:
-        df = pd.read_csv(input_file, dtype=str)
-        df['Course Code'] = df['Sec Name'].apply(lambda x: '-'.join(x.split('-')[:-1]))
-
-        instructors = df['Sec Faculty Info'].dropna().unique()
-        manual_name = st.text_input("Or manually enter instructor name:")
-        selected_name = st.selectbox("Select Instructor", options=instructors)
+        search = get_instructor_search(df)
+        query = st.text_input("Search instructors (name, last name or first letters):").strip()
 
-        instructor_name = manual_name.strip() if manual_name else selected_name
+        # A query narrows the picker to its matches; the query itself stays the
+        # first option, so a report can cover every match (e.g. all "Smith" rows)
+        if query:
+            instructors = [query] + [name for name in search.suggest(query) if name != query]
+        else:
+            instructors = search.faculty_names
+        instructor_name = st.selectbox("Select Instructor", options=instructors)
 
         run_btn = st.button("Generate Report")
-        if run_btn:
+        instructor_name = shown_report(df, 'instructor', instructor_name, run_btn)
+        if instructor_name:
             with st.spinner("Processing..."):
-                # Numeric conversions
-                df['FTE Count'] = pd.to_numeric(df['FTE Count'], errors='coerce').fillna(0)
-                df['Capacity'] = pd.to_numeric(df['Capacity'], errors='coerce').fillna(0)
-                df['Contact Hours'] = pd.to_numeric(df['Contact Hours'], errors='coerce').fillna(0)
-                df['Tier Value'] = pd.to_numeric(df['Tier Value'], errors='coerce').fillna(0)
-
-                df['Calculated FTE'] = ((df['Contact Hours'] * 16 * df['FTE Count']) / 512).round(3)
-                df['Generated FTE'] = ((df['Tier Value'] + 1926) * df['Calculated FTE']).round(2)
-                df['Enrollment Per'] = df.apply(lambda row: (row['FTE Count'] / row['Capacity']) if row['Capacity'] != 0 else 0, axis=1).round(4)
-
-                faculty_df = df[df['Sec Faculty Info'].str.contains(instructor_name, case=False, na=False)]
-                if faculty_df.empty:
+                faculty_df, top_10_df = precomputed_report(df, 'instructor', instructor_name)
+                if faculty_df is None:
                     st.error("No matching instructor found.")
+                    suggestions = search.suggest(instructor_name, limit=5)
+                    if suggestions:
+                        st.write("Did you mean: " + "; ".join(suggestions))
+                        if st.checkbox("Show the sections of every close match", key="instructor_fuzzy"):
+                            fuzzy_df, _ = fte_per_instructor(df, instructor_name, fuzzy=True)
+                            fuzzy_key = ('instructor_fuzzy', _report_key('instructor', instructor_name)[1])
+                            report_viewer(get_report_view(df, fuzzy_key, fuzzy_df), "instructor_fuzzy")
                     return
 
-                faculty_df = faculty_df.drop_duplicates(subset='Sec Name')
-                faculty_df = faculty_df.sort_values(by=['Course Code', 'Sec Name'])
-
-                # Add total row for Generated FTE
-                total_generated_fte = faculty_df['Generated FTE'].sum()
-                total_row = {
-                    'Sec Divisions': '',
-                    'Course Code': '',
-                    'Sec Name': 'Total',
-                    'X Sec Delivery Method': '',
-                    'Meeting Times': '',
-                    'Capacity': '',
-                    'FTE Count': '',
-                    'Contact Hours': '',
-                    'Tier Value': '',
-                    'Calculated FTE': '',
-                    'Enrollment Per': '',
-                    'Generated FTE': total_generated_fte
-                }
-                faculty_df = pd.concat([faculty_df, pd.DataFrame([total_row])], ignore_index=True)
-
-                st.dataframe(faculty_df)
+                report_viewer(get_report_view(df, _report_key('instructor', instructor_name), faculty_df), f"instructor_{instructor_name}")
 
                 # Save top 10 FTE and figure
-                top_10_df = faculty_df.nlargest(10, 'Generated FTE')
-                fig, ax = plt.subplots(figsize=(10, 6))
-                ax.barh(top_10_df['Sec Name'], top_10_df['Generated FTE'], color='lightgreen')
-                ax.set_xlabel('Generated FTE')
-                ax.set_title(f'Top 10 FTE for {instructor_name}')
-                st.pyplot(fig)
-
-                # Set file-safe name
-                name_parts = instructor_name.split()
-                faculty_code = f"{name_parts[-1].lower()}{name_parts[0][0].lower()}" if len(name_parts) >= 2 else "faculty_fte"
-
-                # Save to Excel
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                    faculty_df.to_excel(writer, index=False, sheet_name='FTE Report')
-                    top_10_df.to_excel(writer, index=False, sheet_name='Top 10 FTE')
-
-                    workbook = writer.book
-                    chart_sheet = workbook.create_sheet("FTE Chart")
-
-                    tmp_image = BytesIO()
-                    fig.savefig(tmp_image, format="png")
-                    tmp_image.seek(0)
-                    img = ExcelImage(tmp_image)
-                    chart_sheet.add_image(img, "B2")
-
-                output.seek(0)
-                st.download_button(
-                    label="Save Report",
-                    data=output,
-                    file_name=f"{faculty_code}_fte_report.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                chart_png = top_10_chart_png(
+                    df, ('instructor', instructor_name.lower()), top_10_df, 'Sec Name',
+                    f'Top 10 FTE for {instructor_name}', color='lightgreen'
+                )
+                st.image(chart_png)
+
+                report_download_button(
+                    faculty_df, f"{instructor_file_code(instructor_name)}_fte_report", top_10_df, chart_png,
+                    artifact=('instructor', instructor_name.lower(), dataset_version(df)), total_row=True
                 )
         else:
             st.button("Save Report", disabled=True)
 
-    except FileNotFoundError:
-        st.error(f"File '{input_file}' not found.")
     except Exception as e:
         st.error(f"Unexpected error: {e}")
 
@@ -260,12 +835,238 @@ def fte_by_instructor():
         st.switch_page("app.py")
 
 
+def room_utilization(df):
+    st.subheader("Room Utilization")
+    st.write("Room usage, double bookings and peak hours from the Meeting Times column.")
+
+    try:
+        schedule = get_room_schedule(df)
+        if schedule.intervals.empty:
+            st.info("No timed, in-person meetings found.")
+            return
+
+        limit_to_date = st.checkbox("Only meetings in session on a given date")
+        on_date = st.date_input("Date") if limit_to_date else None
+
+        if not schedule.invalid_meetings.empty:
+            st.warning(f"{len(schedule.invalid_meetings)} meetings end at or before their start time and are left out.")
+            with st.expander("Meetings left out"):
+                st.dataframe(schedule.invalid_meetings, hide_index=True)
+
+        st.subheader("Utilization (Mon-Fri, 7:00AM-10:00PM)")
+        st.dataframe(schedule.room_utilization(on_date=on_date))
+
+        st.subheader("Room Conflicts")
+        conflicts = schedule.conflicts(on_date=on_date)
+        if conflicts.empty:
+            st.success("No overlapping bookings found.")
+        else:
+            st.dataframe(conflicts)
+
+        st.subheader("Rooms in Use by Time of Day")
+        occupancy = schedule.peak_occupancy(on_date=on_date)
+        st.line_chart(occupancy)
+        st.dataframe(occupancy)
+
+    except Exception as e:
+        st.error(f"Unexpected error: {e}")
+
+
+def what_if_funding(df):
+    st.subheader("What-If Funding")
+    st.write("Change the base rate, tiers or enrollment and compare Generated FTE totals with the loaded data.")
+
+    try:
+        engine = get_scenario_engine(df)
+        group_by = st.radio("Totals by", options=list(GROUPINGS), horizontal=True)
+
+        base_rate = st.slider("Base rate", 0, 2 * BASE_FUNDING_RATE, BASE_FUNDING_RATE, step=10)
+        enrollment_scale = st.slider("Enrollment (x current)", 0.5, 1.5, 1.0, step=0.05)
+        capacity_scale = st.slider("Seats (x current capacity)", 0.5, 2.0, 1.0, step=0.05)
+
+        prefixes = st.multiselect("Course prefixes with a new tier value", options=list(get_lookup_index(df).prefixes))
+        tier_value = st.number_input("New tier value", min_value=0, value=5340, step=10) if prefixes else None
+        overrides = {prefix: tier_value for prefix in prefixes}
+
+        # Current data and the scenario, evaluated together
+        scenarios = pd.DataFrame({
+            BASE_RATE_COLUMN: [BASE_FUNDING_RATE, base_rate],
+            ENROLLMENT_SCALE_COLUMN: [1.0, enrollment_scale],
+            CAPACITY_SCALE_COLUMN: [1.0, capacity_scale],
+            **{tier_column(prefix): [np.nan, value] for prefix, value in overrides.items()},
+        }, index=['Current', 'Scenario'])
+        comparison = engine.evaluate(scenarios, by=group_by).T
+        comparison['Change'] = (comparison['Scenario'] - comparison['Current']).round(2)
+        comparison = comparison.sort_values('Change', key=abs, ascending=False)
+        st.metric("Total Generated FTE", f"{comparison['Scenario'].sum():,.2f}", f"{comparison['Change'].sum():,.2f}")
+        st.dataframe(comparison)
+
+        # Base rate sweep for the same tiers, enrollment and seats, as one batch
+        sweep = scenario_grid(
+            np.linspace(BASE_FUNDING_RATE * 0.5, BASE_FUNDING_RATE * 1.5, 41), [enrollment_scale], [capacity_scale],
+            {'new tiers': overrides},
+        )
+        sweep_totals = engine.evaluate(sweep, by=group_by).sum(axis=1)
+        sweep_totals.index = sweep[BASE_RATE_COLUMN]
+        st.subheader("Total Generated FTE by Base Rate")
+        st.line_chart(sweep_totals)
+
+    except Exception as e:
+        st.error(f"Unexpected error: {e}")
+
+
+def capacity_planning(df):
+    st.subheader("Capacity Planning")
+    st.write("Sections to merge or add across the term, by enrollment, waitlists, delivery method and meeting slot.")
+
+    try:
+        underfilled = st.slider("Merge sections filled below", 0.0, 1.0, UNDERFILLED_FILL, step=0.05)
+        add_fill = st.slider("Add a section to groups filled at or above", 0.5, 1.5, ADD_SECTION_FILL, step=0.05)
+        retention = st.slider("Share of merged students retained", 0.0, 1.0, MERGE_RETENTION, step=0.05)
+
+        with stage("plan.capacity", rows=len(df)):
+            plan = plan_capacity(df, underfilled_fill=underfilled, retention=retention, add_section_fill=add_fill)
+
+        divisions = st.multiselect("Divisions", options=sorted(plan['Sec Divisions'].dropna().astype(str).unique()))
+        if divisions:
+            plan = plan[plan['Sec Divisions'].astype(str).isin(divisions)]
+
+        merges, additions, change = st.columns(3)
+        merges.metric("Sections to merge", int((plan['Action'] == 'Merge').sum()))
+        additions.metric("Sections to add", int((plan['Action'] == 'Add').sum()))
+        change.metric("Generated FTE change", f"{plan['Generated FTE Change'].sum():,.2f}")
+        st.dataframe(plan, hide_index=True)
+
+        st.download_button(
+            label="Save Plan",
+            data=plan.to_csv(index=False),
+            file_name="capacity_plan.csv",
+            mime=EXPORT_MIME_TYPES['csv'],
+        )
+
+    except Exception as e:
+        st.error(f"Unexpected error: {e}")
+
+
+def faculty_workload(df):
+    st.subheader("Faculty Workload")
+    st.write("Sections, contact hours and FTE credited to every instructor per term, team-taught sections included.")
+
+    try:
+        workload = get_faculty_workload(df)
+        weighting = st.radio(
+            "Team-taught sections", options=list(WEIGHTINGS), horizontal=True,
+            format_func=lambda name: {'shared': "Split between instructors", 'full': "Full credit to each"}[name],
+        )
+
+        with stage("workload.totals", weighting=weighting):
+            totals = workload.totals(weighting)
+        report_viewer(get_report_view(df, ('workload', weighting), totals), f"workload_{weighting}")
+        st.download_button(
+            label="Save Workload",
+            data=totals.to_csv(index=False),
+            file_name=f"faculty_workload_{weighting}.csv",
+            mime=EXPORT_MIME_TYPES['csv'],
+        )
+
+        instructor = st.selectbox("Drill into instructor", options=["None"] + workload.instructors)
+        if instructor != "None":
+            st.dataframe(workload.instructor_sections(instructor, weighting), hide_index=True)
+
+    except Exception as e:
+        st.error(f"Unexpected error: {e}")
+
+
+def cube_explorer(df):
+    st.subheader("Cube Explorer")
+    st.write("Drill down or cross-tabulate FTE totals from the pre-aggregated cube.")
+
+    try:
+        source = st.radio("Data", options=["Loaded data", "Saved history (latest snapshot per term)"], horizontal=True)
+        cube = get_olap_cube(df) if source == "Loaded data" else get_history_cube()
+
+        path = DRILL_PATHS[st.selectbox("Drill path", options=list(DRILL_PATHS))]
+
+        # Each level narrows the next one down, until a level is left at "All"
+        filters = {}
+        for level, next_level in zip(path, path[1:] + [None]):
+            with stage("olap.rollup", by=level):
+                table = cube.rollup([level], filters)
+            st.write(f"By {level}")
+            st.dataframe(table)
+            if next_level is None:
+                break
+            choice = st.selectbox(f"Drill into {level}", options=["All"] + table.index.tolist(), key=f"cube_{level}")
+            if choice == "All":
+                break
+            filters[level] = choice
+
+        st.subheader("Cross-tab")
+        rows_col, columns_col, measure_col = st.columns(3)
+        rows = rows_col.selectbox("Rows", options=CUBE_DIMENSIONS, index=1)
+        columns = columns_col.selectbox("Columns", options=[dim for dim in CUBE_DIMENSIONS if dim != rows], index=4)
+        measure = measure_col.selectbox("Measure", options=CUBE_MEASURES, index=len(CUBE_MEASURES) - 1)
+        with stage("olap.rollup", by=f"{rows} x {columns}"):
+            crosstab = cube.rollup([rows, columns], filters)[measure].unstack(fill_value=0)
+        st.dataframe(crosstab)
+
+    except Exception as e:
+        st.error(f"Unexpected error: {e}")
+
+
+def snapshot_changes():
+    st.subheader("Snapshot Changes")
+    st.write("Sections added, cancelled and changed between saved daily snapshots.")
+
+    try:
+        snapshots = list_snapshots()
+        if snapshots.empty:
+            st.info("Save uploads to the snapshot history to compare them.")
+            return
+
+        term = st.selectbox("Term", options=sorted(snapshots['Term'].unique(), reverse=True))
+        dates = sorted(snapshots.loc[snapshots['Term'] == term, 'Snapshot Date'])
+        if len(dates) < 2:
+            st.info("Save at least two snapshots of this term to compare them.")
+            return
+
+        from_date, to_date = st.select_slider("Compare snapshots", options=dates, value=(dates[-2], dates[-1]))
+        day_by_day = st.checkbox("Show day-by-day changes in between")
+
+        selected = [date for date in dates if from_date <= date <= to_date] if day_by_day else [from_date, to_date]
+        with stage("diff.snapshots", term=term, snapshots=len(selected)):
+            frames = {date: load_history_dataset(term, date) for date in selected}
+            diff = diff_snapshots(frames[from_date], frames[to_date])
+
+        counts = diff['Status'].value_counts()
+        added, cancelled, changed = st.columns(3)
+        added.metric("Sections added", int(counts['Added']))
+        cancelled.metric("Sections cancelled", int(counts['Cancelled']))
+        changed.metric("Sections changed", int(counts['Changed']))
+        st.metric("Generated FTE change", f"{diff['Generated FTE Change'].sum():,.2f}")
+
+        by = st.radio("Roll up by", options=list(ROLLUPS), horizontal=True)
+        st.dataframe(rollup_diff(diff, by))
+
+        st.subheader("Changed Sections")
+        changes = diff[diff['Status'] != 'Unchanged']
+        st.dataframe(changes)
+        report_download_button(changes, f"{term.lower()}_{from_date}_{to_date}_changes", sheet_name='Changes')
+
+        if day_by_day:
+            st.subheader("Day by Day")
+            st.dataframe(diff_series(frames))
+
+    except Exception as e:
+        st.error(f"Unexpected error: {e}")
+
+
 def fte_per_course(df, course_code):
     """
-    Generate FTE report by course, calculating new Calculated FTE, Generated FTE, and Enrollment Percentage.
+    Returns the FTE report rows (one per section) and the top 10 sections for a course.
     """
     # Filter data by selected course code
-    course_df = df[df['Course Code'].str.strip() == course_code]
+    course_df = df.iloc[get_lookup_index(df).course_rows(course_code)]
     
     # Drop duplicate sections
     course_df = course_df.drop_duplicates(subset='Sec Name')
@@ -273,44 +1074,180 @@ def fte_per_course(df, course_code):
     if course_df.empty:
         return None, None
 
-    # Perform FTE calculations
-    course_df['FTE Count'] = pd.to_numeric(course_df['FTE Count'], errors='coerce').fillna(0)
-    course_df['Capacity'] = pd.to_numeric(course_df['Capacity'], errors='coerce').fillna(0)
-    course_df['Contact Hours'] = pd.to_numeric(course_df['Contact Hours'], errors='coerce').fillna(0)
-    course_df['Tier Value'] = pd.to_numeric(course_df['Tier Value'], errors='coerce').fillna(0)
-
-    # FTE Calculations
-    course_df['Calculated FTE'] = ((course_df['Contact Hours'] * 16 * course_df['FTE Count']) / 512).round(3)
-    course_df['Generated FTE'] = ((course_df['Tier Value'] + 1926) * course_df['Calculated FTE']).round(2)
-    course_df['Enrollment Per'] = course_df.apply(lambda row: (row['FTE Count'] / row['Capacity']) if row['Capacity'] != 0 else 0, axis=1).round(4)
-
     # Top 10 FTE records
     top_fte = course_df.nlargest(10, 'Generated FTE')
 
     output_df = course_df[['Sec Divisions', 'Course Code', 'Sec Name', 'X Sec Delivery Method', 
                            'Meeting Times', 'Capacity', 'FTE Count', 'Contact Hours', 'Calculated FTE', 
                            'Enrollment Per', 'Generated FTE']]
-    
-    # Add total row
-    total_generated_fte = output_df['Generated FTE'].sum()
-    total_row = {
-        'Sec Divisions': '',
-        'Course Code': '',
-        'Sec Name': 'Total',
-        'X Sec Delivery Method': '',
-        'Meeting Times': '',
-        'Capacity': '',
-        'FTE Count': '',
-        'Contact Hours': '',
-        'Calculated FTE': '',
-        'Enrollment Per': '',
-        'Generated FTE': total_generated_fte
-    }
-    output_df = pd.concat([output_df, pd.DataFrame([total_row])], ignore_index=True)
 
     return output_df, top_fte
 
 
+def _report_key(kind, entity):
+    entity = entity.strip()
+    return (kind, entity.lower() if kind in ('division', 'instructor') else entity.upper())
+
+
+def _compute_report(df, kind, entity):
+    with stage(f"report.{kind}", entity=entity):
+        if kind == 'division':
+            return fte_by_division(df, entity)
+        if kind == 'course':
+            return fte_per_course(df, entity.upper())
+        if kind == 'instructor':
+            return fte_per_instructor(df, entity)
+        return course_enrollment_percentage(entity, df)
+
+
+def start_precompute(df):
+    """
+    Queues every division, course, enrollment and instructor report table for
+    this dataset on the shared background executor (once per dataset version).
+    """
+    version = dataset_version(df)
+    if not version:
+        return
+
+    # Build the lookup and instructor indexes here so the workers only slice
+    def submit_jobs(executor):
+        index = get_lookup_index(df)
+        get_instructor_search(df)
+        entities = [('division', code) for code in index.divisions]
+        entities += [(kind, code) for code in index.courses for kind in ('course', 'enrollment')]
+        entities += [('instructor', name) for name in df['Sec Faculty Info'].dropna().unique()]
+
+        jobs = {}
+        for kind, entity in entities:
+            jobs.setdefault(_report_key(kind, entity), executor.submit(_compute_report, df, kind, entity))
+        return jobs
+
+    # Datasets that dropped out of the cache are forgotten (and their jobs stopped)
+    background.queue_precompute(version, submit_jobs, DATASET_CACHE_ENTRIES)
+
+
+def precomputed_report(df, kind, entity):
+    """
+    Returns a report table from the background precompute: finished, awaited if
+    in flight, or computed right here if it has not started yet.
+    """
+    result, hit = background.precomputed(
+        dataset_version(df), _report_key(kind, entity), lambda: _compute_report(df, kind, entity)
+    )
+    count_lookup("precompute")
+    if not hit:
+        count_miss("precompute")
+    return result
+
+
+def api_report(df, kind, entity):
+    # The report table behind a query API endpoint (no chart or workbook)
+    report = precomputed_report(df, kind, entity)
+    return report if kind == 'enrollment' else report[0]
+
+
+def api_entities(df, kind):
+    if kind == 'instructor':
+        return get_instructor_search(df).faculty_names
+    column = 'Sec Divisions' if kind == 'division' else 'Course Code'
+    return sorted(df[column].dropna().astype(str).str.strip().unique())
+
+
+@st.cache_resource(show_spinner=False)
+def _query_api_cached(host, port):
+    # A failed bind is kept too, so a taken port isn't retried on every rerun. The
+    # API outlives the run that built it; api_report reads the precompute jobs
+    # from background.py, which every session shares
+    api = QueryAPI(api_report, api_entities, host, port)
+    try:
+        api.start()
+    except OSError as e:
+        return None, e
+    return api, None
+
+
+def get_query_api():
+    """
+    Returns (api, error) for the read-only query API served alongside the app
+    (one per process): error is the OSError the port failed to bind with, and
+    both are None when CSAR_API_PORT is 0.
+    """
+    port = int(os.environ.get(API_PORT_ENV, API_PORT))
+    if not port:
+        return None, None
+    return _query_api_cached(API_HOST, port)
+
+
+def history_sidebar(df):
+    """
+    Sidebar for the snapshot history store. Saves the current upload, or
+    returns a stored snapshot to report on when nothing is uploaded.
+    """
+    st.sidebar.subheader("Snapshot History")
+
+    if df is not None:
+        snapshot_date = st.sidebar.date_input("Snapshot date")
+        if st.sidebar.button("Save upload to history"):
+            added = ingest_snapshot(df.drop(columns=FTE_METRIC_COLUMNS), snapshot_date.isoformat())
+            for term, count in added.items():
+                st.sidebar.success(f"{term}: {count} new sections saved.")
+        return df
+
+    snapshots = list_snapshots()
+    if snapshots.empty:
+        st.sidebar.write("No snapshots saved yet.")
+        return None
+
+    labels = [f"{row['Term']} ({row['Snapshot Date']})" for _, row in snapshots.iterrows()]
+    choice = st.sidebar.selectbox("Or report on a saved snapshot:", options=[""] + labels)
+    if not choice:
+        return None
+
+    selected = snapshots.iloc[labels.index(choice)]
+    return load_history_dataset(selected['Term'], selected['Snapshot Date'])
+
+
+def debug_panel():
+    """
+    Sidebar performance panel: per-stage timings, cache hit rates and the most
+    recent stage records. Shown only with CSAR_DEBUG=1 or ?debug=1.
+    """
+    if os.environ.get(DEBUG_PANEL_ENV) != "1" and st.query_params.get("debug") != "1":
+        return
+
+    with st.sidebar.expander("Performance", expanded=False):
+        trace = st.checkbox("Trace peak memory per stage", value=instrumentation.memory_tracing())
+        instrumentation.set_memory_tracing(trace)
+
+        st.write("Stages")
+        st.dataframe(pd.DataFrame(instrumentation.stage_summary()))
+        st.write("Caches")
+        st.dataframe(pd.DataFrame(instrumentation.cache_summary()))
+        st.write("Recent")
+        st.dataframe(pd.DataFrame(instrumentation.recent_stages()[::-1][:50]))
+
+        if st.button("Reset counters"):
+            instrumentation.reset()
+
+
+def _import_deferred():
+    with stage("startup.prewarm"):
+        for module in DEFERRED_IMPORTS:
+            importlib.import_module(module)
+
+
+def prewarm_deferred_imports():
+    """
+    Imports DEFERRED_IMPORTS on a background thread, once per process, so the
+    first chart or xlsx export does not wait for them.
+    """
+    with background.prewarm_lock:
+        if background.prewarm_started:
+            return
+        background.prewarm_started = True
+    threading.Thread(target=_import_deferred, name="csar-prewarm", daemon=True).start()
+
+
 # Main Streamlit function
 def app():
     st.title("Dean's Report Generator")
@@ -318,14 +1255,43 @@ def app():
     # Step 1: Upload the spreadsheet on the first page
     uploaded_file = st.file_uploader("Upload the Dean's Report Spreadsheet (csv)", type="csv")
 
+    df = None
     if uploaded_file is not None:
-        # Load the CSV data into a DataFrame
-        df = read_spreadsheets(uploaded_file)
-        st.write("File successfully uploaded! Here are the columns in the file:")
+        # Load the CSV data into a DataFrame (memoized, shared by every report)
+        try:
+            df = load_upload_with_progress(uploaded_file)
+        except FileNotFoundError as e:
+            st.error(f"Reference file '{e.filename}' not found.")
+            return
+        except pd.errors.EmptyDataError:
+            st.error("The uploaded file has no data rows.")
+            return
+
+    df = history_sidebar(df)
+    if df is not None:
+        start_precompute(df)
+    api, api_error = get_query_api()
+    if api is not None:
+        # Only a newly loaded dataset is added (and becomes the latest); reruns
+        # of sessions on a dataset already served leave the API as it is
+        if df is not None:
+            api.publish(dataset_version(df), df)
+        st.sidebar.caption(f"Query API: http://{api.host}:{api.port}/datasets")
+    elif api_error is not None and not st.session_state.get('query_api_warned'):
+        st.session_state['query_api_warned'] = True
+        st.sidebar.warning(f"Query API not started: {api_error}")
+    st.sidebar.selectbox("Download format", options=list(EXPORT_MIME_TYPES), key='export_format')
+    debug_panel()
+
+    if df is not None:
+        if uploaded_file is not None:
+            st.write("File successfully uploaded! Here are the columns in the file:")
+        else:
+            st.write("Saved snapshot loaded! Here are the columns in the file:")
         st.write(df.columns.tolist())
 
         # Step 2: Once the file is uploaded, show the options to select
-        option = st.radio("Select an option:", ["Sec Division Report", "Course Enrollment Percentage", "FTE by Division", "FTE per Instructor", "FTE per Course"])
+        option = st.radio("Select an option:", ["Sec Division Report", "Course Enrollment Percentage", "FTE by Division", "FTE per Instructor", "FTE per Course", "Room Utilization", "What-If Funding", "Capacity Planning", "Faculty Workload", "Cube Explorer", "Snapshot Changes"])
 
         if option == "Sec Division Report":
             st.subheader("Sec Division Report")
@@ -344,21 +1310,21 @@ def app():
                 run_report_button = st.button("Run Report")
 
                 if run_report_button:
-                    output_files, error_message = sec_divisions(df, final_input)
+                    export_format = st.session_state.get('export_format', 'xlsx')
+                    output_files, error_message = sec_divisions(df, final_input, export_format)
 
                     if error_message:
                         st.error(error_message)
                     else:
                         st.success("Report generated successfully!")
 
-                        for output_file in output_files:
-                            with open(output_file, "rb") as file:
-                                st.download_button(
-                                    label=f"Download {output_file}",
-                                    data=file,
-                                    file_name=output_file,
-                                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                                )
+                        for file_name, data in output_files:
+                            st.download_button(
+                                label=f"Download {file_name}",
+                                data=data,
+                                file_name=file_name,
+                                mime=EXPORT_MIME_TYPES[export_format]
+                            )
 
                         if st.button("Go Back to Main Page"):
                             st.experimental_rerun()
@@ -367,12 +1333,8 @@ def app():
         elif option == "Course Enrollment Percentage":
             st.subheader("Course Enrollment Percentage")
             st.write("This feature will display course enrollment percentages.")
-            
-            input_file = "deanDailyCsar.csv"
 
             try:
-                df = pd.read_csv(input_file, dtype=str)
-
                 required_columns = [
                     'Sec Divisions', 'Sec Name', 'X Sec Delivery Method', 'Meeting Times',
                     'Capacity', 'FTE Count', 'Contact Hours', 'Sec Faculty Info'
@@ -383,14 +1345,13 @@ def app():
                     st.error(f"Missing columns: {missing}")
                     return
 
-                df['Course Code'] = df['Sec Name'].apply(lambda x: '-'.join(x.split('-')[:-1]) if isinstance(x, str) else "")
                 course_codes = sorted(df['Course Code'].dropna().unique())
 
                 manual_input = st.text_input("Or manually enter Course Code:")
                 selected_code = st.selectbox("Select a Course Code:", options=course_codes)
 
                 course_code = manual_input.strip().upper() if manual_input else selected_code
-                valid_code = any(re.match(fr'^{re.escape(course_code)}$', cc, re.IGNORECASE) for cc in course_codes)
+                valid_code = bool(course_code) and course_code.upper() in get_lookup_index(df).courses
 
                 if manual_input and not valid_code:
                     st.error("Invalid course code. Please enter a valid one from the list.")
@@ -400,7 +1361,7 @@ def app():
                 report_df = None
                 if run_btn and valid_code:
                     with st.spinner("Generating report..."):
-                        report_df = course_enrollment_percentage(course_code, df)
+                        report_df = precomputed_report(df, 'enrollment', course_code)
                         if report_df is None:
                             st.error("No data found for that Course Code.")
                             return
@@ -410,22 +1371,13 @@ def app():
 
                 # Handle the Save Report button logic
                 if report_df is not None:
-                    output = BytesIO()
-                    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                        report_df.to_excel(writer, index=False, sheet_name='Enrollment Data')
-                        writer.book.active = writer.book['Enrollment Data']
-                        sheet = writer.book['Enrollment Data']
-                        for col in sheet.columns:
-                            col_letter = col[0].column_letter
-                            sheet.column_dimensions[col_letter].width = 25
-                    output.seek(0)
-
                     # Only display the download button if a report has been generated
-                    st.download_button(
-                        label="Save Report",
-                        data=output.getvalue(),
-                        file_name=f"{course_code.replace('-', '').lower()}_enrollment_report.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                    report_download_button(
+                        report_df,
+                        f"{course_code.replace('-', '').lower()}_enrollment_report",
+                        sheet_name='Enrollment Data',
+                        column_width=25,
+                        artifact=('enrollment', course_code.upper(), dataset_version(df)),
                     )
                 else:
                     st.download_button("Save Report", data=None, disabled=True, key="disabled_btn")
@@ -433,8 +1385,6 @@ def app():
                 if st.button("Return Home"):
                     st.switch_page("app.py")
 
-            except FileNotFoundError:
-                st.error(f"File '{input_file}' not found.")
             except Exception as e:
                 st.error(f"Unexpected error: {e}")
 
@@ -442,12 +1392,9 @@ def app():
         elif option == "FTE by Division":
             st.subheader("FTE by Division")
             st.write("This feature will display FTE by Division.")
-            
-            input_file = "deanDailyCsar.csv"
 
             try:
-                df = pd.read_csv(input_file, dtype=str)
-                division_list = df['Sec Divisions'].str.strip().str.lower().unique()
+                division_list = list(get_lookup_index(df).divisions)
 
                 # Selection interface
                 st.subheader("Select or Enter Division Code")
@@ -457,73 +1404,44 @@ def app():
 
                 # Report generation
                 run_btn = st.button("Generate Report")
-                report_generated = False
+                division_code = shown_report(df, 'division', division_code, run_btn)
 
-                if run_btn:
+                if division_code:
                     with st.spinner("Generating report..."):
-                        report_df, top_10_df, plot_fig, div_code = generate_fte_by_division(df, division_code)
+                        report_df, top_10_df = precomputed_report(df, 'division', division_code)
 
                         if report_df is None:
                             st.error("No data found for this division.")
                         else:
+                            chart_png = division_chart_png(df, division_code, top_10_df)
                             st.success("Report generated successfully.")
-                            st.subheader(f"FTE Report for Division {div_code.upper()}")
-                            st.dataframe(report_df)
+                            st.subheader(f"FTE Report for Division {division_code.upper()}")
+                            report_viewer(get_report_view(df, _report_key('division', division_code), report_df), f"division_{division_code}")
 
                             st.subheader("Top 10 Courses by Generated FTE")
-                            st.pyplot(plot_fig)
-
-                            report_generated = True
+                            st.image(chart_png)
 
                             # Save both report and plot
-                            output = BytesIO()
-                            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                                report_df.to_excel(writer, index=False, sheet_name='FTE Report')
-                                top_10_df.to_excel(writer, index=False, sheet_name='Top 10 FTE')
-                                writer.book.create_sheet("FTE Chart")
-
-                                chart_sheet = writer.book["FTE Chart"]
-                                tmp_image = BytesIO()
-                                plot_fig.savefig(tmp_image, format="png")
-                                tmp_image.seek(0)
-
-                                img = ExcelImage(tmp_image)
-                                chart_sheet.add_image(img, "B2")
-
-                                for col in chart_sheet.columns:
-                                    if hasattr(col[0], 'column_letter'):
-                                        chart_sheet.column_dimensions[col[0].column_letter].width = 25
-
-                            tmp_image.close()
-
-                            st.download_button(
-                                label="Save Report",
-                                data=output.getvalue(),
-                                file_name=f"{division_code}_fte_report.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            report_download_button(
+                                report_df, f"{division_code}_fte_report", top_10_df, chart_png,
+                                artifact=('division', division_code.strip().lower(), dataset_version(df)), total_row=True
                             )
                 else:
                     st.button("Save Report", disabled=True)
 
-            except FileNotFoundError:
-                st.error(f"CSV file '{input_file}' not found.")
             except Exception as e:
                 st.error(f"Unexpected error: {e}")
         
 
         elif option == "FTE per Instructor":
-            fte_by_instructor()
+            fte_by_instructor(df)
 
 
         elif option == "FTE per Course":
             st.subheader("FTE per Course")
             st.write("This feature will display FTE per Course.")
-            
-            input_file = "deanDailyCsar.csv"
-            try:
-                df = pd.read_csv(input_file, dtype=str)
-                df['Course Code'] = df['Sec Name'].apply(lambda x: '-'.join(x.split('-')[:-1]))
 
+            try:
                 course_codes = df['Course Code'].str.strip().unique()
                 manual_code = st.text_input("Or manually enter Course Code:")
                 selected_code = st.selectbox("Select Course Code", options=course_codes)
@@ -531,103 +1449,70 @@ def app():
                 course_code = manual_code.strip() if manual_code else selected_code
 
                 run_btn = st.button("Generate Report")
-                report_generated = False
+                course_code = shown_report(df, 'course', course_code, run_btn)
 
-                if run_btn:
+                if course_code:
                     with st.spinner("Generating report..."):
-                        output_df, top_fte = fte_per_course(df, course_code.upper())
+                        output_df, top_fte = precomputed_report(df, 'course', course_code)
 
                         if output_df is None:
                             st.error("No data found for this course code.")
                         else:
                             st.success("Report generated successfully.")
                             st.subheader(f"FTE Report for Course {course_code.upper()}")
-                            st.dataframe(output_df)
+                            report_viewer(get_report_view(df, _report_key('course', course_code), output_df), f"course_{course_code.upper()}")
 
                             st.subheader("Top 10 Sections by Generated FTE")
-                            fig, ax = plt.subplots(figsize=(10, 6))
-                            ax.barh(top_fte['Sec Name'], top_fte['Generated FTE'], color='skyblue')
-                            ax.set_xlabel('Generated FTE')
-                            ax.set_title(f'Top 10 FTE for {course_code}')
-                            st.pyplot(fig)
+                            chart_png = top_10_chart_png(
+                                df, ('course', course_code.upper()), top_fte, 'Sec Name', f'Top 10 FTE for {course_code}'
+                            )
+                            st.image(chart_png)
 
                             # Save both report and plot
-                            output = BytesIO()
-                            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                                output_df.to_excel(writer, index=False, sheet_name='FTE Report')
-                                top_fte.to_excel(writer, index=False, sheet_name='Top 10 FTE')
-                                writer.book.create_sheet("FTE Chart")
+                            report_download_button(
+                                output_df, f"{course_code.lower()}_fte_report", top_fte, chart_png,
+                                artifact=('course', course_code.upper(), dataset_version(df)), total_row=True
+                            )
+                else:
+                    st.button("Save Report", disabled=True)
 
-                                chart_sheet = writer.book["FTE Chart"]
-                                tmp_image = BytesIO()
-                                fig.savefig(tmp_image, format="png")
-                                tmp_image.seek(0)
+            except Exception as e:
+                st.error(f"Unexpected error: {e}")
 
-                                img = ExcelImage(tmp_image)
-                                chart_sheet.add_image(img, "B2")
 
-                                for col in chart_sheet.columns:
-                                    if hasattr(col[0], 'column_letter'):
-                                        chart_sheet.column_dimensions[col[0].column_letter].width = 25
+        elif option == "Room Utilization":
+            room_utilization(df)
 
-                            tmp_image.close()
 
-                            st.download_button(
-                                label="Save Report",
-                                data=output.getvalue(),
-                                file_name=f"{course_code.lower()}_fte_report.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            )
+        elif option == "What-If Funding":
+            what_if_funding(df)
 
-                            st.subheader("Top 10 Sections by Generated FTE")
-                            fig, ax = plt.subplots(figsize=(10, 6))
-                            ax.barh(top_fte['Sec Name'], top_fte['Generated FTE'], color='skyblue')
-                            ax.set_xlabel('Generated FTE')
-                            ax.set_title(f'Top 10 FTE for {course_code}')
-                            st.pyplot(fig)
 
-                            # Save both report and plot
-                            output = BytesIO()
-                            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                                course_df.to_excel(writer, index=False, sheet_name='FTE Report')
-                                top_fte.to_excel(writer, index=False, sheet_name='Top 10 FTE')
-                                writer.book.create_sheet("FTE Chart")
+        elif option == "Capacity Planning":
+            capacity_planning(df)
 
-                                chart_sheet = writer.book["FTE Chart"]
-                                tmp_image = BytesIO()
-                                fig.savefig(tmp_image, format="png")
-                                tmp_image.seek(0)
 
-                                img = ExcelImage(tmp_image)
-                                chart_sheet.add_image(img, "B2")
+        elif option == "Faculty Workload":
+            faculty_workload(df)
 
-                                for col in chart_sheet.columns:
-                                    if hasattr(col[0], 'column_letter'):
-                                        chart_sheet.column_dimensions[col[0].column_letter].width = 25
 
-                            tmp_image.close()
+        elif option == "Cube Explorer":
+            cube_explorer(df)
 
-                            st.download_button(
-                                label="Save Report",
-                                data=output.getvalue(),
-                                file_name=f"{course_code.lower()}_fte_report.xlsx",
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                            )
-                else:
-                    st.button("Save Report", disabled=True)
 
-            except FileNotFoundError:
-                st.error(f"CSV file '{input_file}' not found.")
-            except Exception as e:
-                st.error(f"Unexpected error: {e}")
+        elif option == "Snapshot Changes":
+            snapshot_changes()
                     
     else:
         st.info("Please upload an excel file to proceed.")
 
     # If no file is uploaded, show a message when trying to select any option
-    if uploaded_file is None:
+    if df is None:
         st.warning("No spreadsheet data detected. Please upload a file to proceed.")
 
+    # Everything above is already on the page
+    prewarm_deferred_imports()
+
 if __name__ == "__main__":
     app()
 